@@ -0,0 +1,136 @@
+from datetime import datetime, time, timedelta
+
+from django.db.models import Count, F, Sum
+from django.db.models.functions import (
+    Coalesce,
+    ExtractHour,
+    ExtractIsoWeekDay,
+    TruncHour,
+    TruncMonth,
+    TruncWeek,
+)
+from django.utils import timezone
+
+from apps.users.models import DoctorProfile
+from .cohorts import cohort_stats, load_columns
+from .hll import HyperLogLog
+from .models import Appointment, DailyAppointmentRollup, MonthlyPatientSketch
+from .rollups import month_of
+
+ROLLUP_BUCKETS = {
+    "day": F("day"),
+    "week": TruncWeek("day"),
+    "month": TruncMonth("day"),
+}
+
+
+def time_range(start_day, end_day):
+    """Aware datetimes covering the whole days ``start_day`` .. ``end_day`` inclusive."""
+    start = timezone.make_aware(datetime.combine(start_day, time.min)) if start_day else None
+    end = timezone.make_aware(datetime.combine(end_day + timedelta(days=1), time.min)) if end_day else None
+    return start, end
+
+
+def filter_appointments(params, queryset=None):
+    start, end = time_range(params.get("from"), params.get("to"))
+    qs = (Appointment.objects.all() if queryset is None else queryset).order_by()
+    if start:
+        qs = qs.filter(scheduled_time__gte=start)
+    if end:
+        qs = qs.filter(scheduled_time__lt=end)
+    if params.get("doctor"):
+        qs = qs.filter(doctor_id=params["doctor"])
+    if params.get("status"):
+        qs = qs.filter(status=params["status"])
+    return qs
+
+
+def appointments_per_bucket(params):
+    """
+    Appointment counts per ``bucket`` as ``[{"date": ..., "count": ...}]``.
+
+    Day, week and month buckets are summed from the daily rollups, filtered
+    on their ``day`` index; hour buckets group the raw appointments of an
+    indexed ``scheduled_time`` range.
+    """
+    bucket = params.get("bucket", "day")
+    if bucket == "hour":
+        qs = filter_appointments(params).annotate(date=TruncHour("scheduled_time"))
+        return list(qs.values("date").annotate(count=Count("id")).order_by("date"))
+
+    qs = DailyAppointmentRollup.objects.order_by()
+    if params.get("from"):
+        qs = qs.filter(day__gte=params["from"])
+    if params.get("to"):
+        qs = qs.filter(day__lte=params["to"])
+    if params.get("doctor"):
+        qs = qs.filter(doctor_id=params["doctor"])
+    if params.get("status"):
+        qs = qs.filter(status=params["status"])
+    return list(
+        qs.annotate(date=ROLLUP_BUCKETS[bucket]).values("date").annotate(count=Sum("count")).order_by("date")
+    )
+
+
+def doctor_load(params):
+    """Per-doctor load heatmap: counts by ISO weekday (1 = Monday) and hour of day."""
+    qs = filter_appointments(params).annotate(
+        weekday=ExtractIsoWeekDay("scheduled_time"),
+        hour=ExtractHour("scheduled_time"),
+    )
+    return list(
+        qs.values("doctor_id", "weekday", "hour")
+        .annotate(count=Count("id"))
+        .order_by("doctor_id", "weekday", "hour")
+    )
+
+
+def patients_per_doctor(params=None):
+    """
+    Distinct patients per doctor.
+
+    Without a range this is the exact all-time rollup. With ``from``/``to``
+    the range is widened to whole months. The count is then estimated by
+    merging the doctors' monthly HyperLogLog sketches, or computed with
+    ``COUNT(DISTINCT patient)`` over the appointments when ``exact`` is set.
+    """
+    params = params or {}
+    doctors = DoctorProfile.objects.order_by("id")
+    if params.get("doctor"):
+        doctors = doctors.filter(pk=params["doctor"])
+    if not params.get("from") and not params.get("to"):
+        return list(
+            doctors.annotate(patient_count=Coalesce("rollup__patient_count", 0))
+            .values("id", "user__username", "specialization", "patient_count")
+        )
+
+    first = month_of(params["from"]) if params.get("from") else None
+    last = month_of(params["to"]) if params.get("to") else None
+    if params.get("exact"):
+        end_day = (last + timedelta(days=31)).replace(day=1) - timedelta(days=1) if last else None
+        counts = dict(
+            filter_appointments({"from": first, "to": end_day, "doctor": params.get("doctor")})
+            .values_list("doctor_id")
+            .annotate(n=Count("patient_id", distinct=True))
+        )
+    else:
+        sketches = MonthlyPatientSketch.objects.order_by()
+        if first:
+            sketches = sketches.filter(month__gte=first)
+        if last:
+            sketches = sketches.filter(month__lte=last)
+        if params.get("doctor"):
+            sketches = sketches.filter(doctor_id=params["doctor"])
+        merged = {}
+        for doctor_id, registers in sketches.values_list("doctor_id", "registers").iterator():
+            merged.setdefault(doctor_id, HyperLogLog()).merge(HyperLogLog(registers))
+        counts = {doctor_id: sketch.count() for doctor_id, sketch in merged.items()}
+
+    rows = list(doctors.values("id", "user__username", "specialization"))
+    for row in rows:
+        row["patient_count"] = counts.get(row["id"], 0)
+    return rows
+
+
+def doctor_cohorts(params):
+    return cohort_stats(load_columns(filter_appointments(params)))
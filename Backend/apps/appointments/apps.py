@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+class AppointmentsConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'apps.appointments'
+
+    def ready(self):
+        # import signals so they register when Django starts
+        import apps.appointments.signals  # noqa: F401
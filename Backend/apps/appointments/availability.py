@@ -0,0 +1,130 @@
+import heapq
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import timedelta
+from itertools import islice
+
+from django.db import transaction
+from django.utils import timezone
+
+from apps.users.models import DoctorProfile
+from .models import Appointment
+
+# Two bookings for the same doctor must be further apart than this.
+BOOKING_BUFFER = timedelta(minutes=30)
+
+# Statuses that hold a doctor's time slot.
+BLOCKING_STATUSES = ("requested", "confirmed")
+
+# Limits for free-slot searches.
+MAX_WINDOW = timedelta(days=31)
+MIN_SLOT_MINUTES = 5
+MAX_SLOT_MINUTES = 240
+
+
+def conflicting_appointments(doctor, scheduled_time, exclude_pk=None):
+    """Blocking appointments of ``doctor`` within the buffer around ``scheduled_time``."""
+    qs = Appointment.objects.filter(
+        doctor=doctor,
+        status__in=BLOCKING_STATUSES,
+        scheduled_time__gte=scheduled_time - BOOKING_BUFFER,
+        scheduled_time__lte=scheduled_time + BOOKING_BUFFER,
+    )
+    if exclude_pk is not None:
+        qs = qs.exclude(pk=exclude_pk)
+    return qs
+
+
+@contextmanager
+def doctor_schedule_lock(*doctor_ids):
+    """
+    Transaction holding a row lock on each doctor's profile.
+
+    Check-then-write booking code runs inside this block so two requests for
+    the same doctor cannot both pass the conflict check, while bookings for
+    other doctors proceed in parallel. Rows are locked in primary-key order
+    to avoid deadlocks between multi-doctor callers. On SQLite, where
+    ``select_for_update`` is a no-op, the ``IMMEDIATE`` transaction mode
+    configured in settings provides the same guarantee database-wide.
+    """
+    with transaction.atomic():
+        list(
+            DoctorProfile.objects.select_for_update()
+            .filter(pk__in=doctor_ids)
+            .order_by("pk")
+            .values_list("pk", flat=True)
+        )
+        yield
+
+
+def booked_times(doctor_ids, start, end):
+    """``(doctor_id, scheduled_time)`` of blocking bookings that can affect slots in ``[start, end)``."""
+    return (
+        Appointment.objects.filter(
+            doctor_id__in=doctor_ids,
+            status__in=BLOCKING_STATUSES,
+            scheduled_time__gte=start - BOOKING_BUFFER,
+            scheduled_time__lte=end + BOOKING_BUFFER,
+        )
+        .order_by("doctor_id", "scheduled_time")
+        .values_list("doctor_id", "scheduled_time")
+    )
+
+
+def first_slot(start, slot, now=None):
+    """First slot boundary at or after ``start`` that is still in the future."""
+    now = now or timezone.now()
+    if start <= now:
+        start = now + timedelta(microseconds=1)
+    day = start.replace(hour=0, minute=0, second=0, microsecond=0)
+    steps = -(-(start - day) // slot)
+    return day + steps * slot
+
+
+def iter_free_slots(booked, start, end, slot, now=None):
+    """
+    Yield bookable slot start times in ``[start, end)``.
+
+    ``booked`` must be sorted ascending. A slot is free when no booking lies
+    within ``BOOKING_BUFFER`` of it, the same rule the booking validator
+    applies. Both the slots and the bookings are walked once, so the cost is
+    linear in their combined length.
+    """
+    i = 0
+    t = first_slot(start, slot, now)
+    while t < end:
+        while i < len(booked) and booked[i] < t - BOOKING_BUFFER:
+            i += 1
+        if i == len(booked) or booked[i] > t + BOOKING_BUFFER:
+            yield t
+        t += slot
+
+
+def free_slots(doctor_id, start, end, slot):
+    booked = [scheduled_time for _, scheduled_time in booked_times([doctor_id], start, end)]
+    return list(iter_free_slots(booked, start, end, slot))
+
+
+def _tagged(slots, doctor_id):
+    for t in slots:
+        yield t, doctor_id
+
+
+def earliest_free_slots(doctor_ids, start, end, slot, limit):
+    """
+    The ``limit`` earliest ``(slot_time, doctor_id)`` pairs across ``doctor_ids``.
+
+    Bookings for all doctors come from one query; each doctor's free slots
+    are then generated lazily and k-way merged, so only as many slots as
+    needed are ever produced.
+    """
+    booked = defaultdict(list)
+    for doctor_id, scheduled_time in booked_times(doctor_ids, start, end):
+        booked[doctor_id].append(scheduled_time)
+
+    now = timezone.now()
+    streams = [
+        _tagged(iter_free_slots(booked[doctor_id], start, end, slot, now), doctor_id)
+        for doctor_id in doctor_ids
+    ]
+    return list(islice(heapq.merge(*streams), limit))
@@ -0,0 +1,181 @@
+from bisect import bisect_left, bisect_right
+from collections import Counter, defaultdict
+
+from rest_framework import serializers
+
+from apps.users.models import DoctorProfile, PatientProfile
+from .availability import BLOCKING_STATUSES, BOOKING_BUFFER, doctor_schedule_lock
+from . import rollups
+from .models import Appointment
+from .serializers import BulkOperationSerializer
+from .transitions import TRANSITIONS
+
+UNAVAILABLE = {"scheduled_time": ["Doctor is not available at the chosen time."]}
+RESCHEDULE = TRANSITIONS["reschedule"]
+
+
+def not_reschedulable(appointment):
+    return {"id": [f"Appointment is {appointment.status}; reschedule is not allowed."]}
+
+
+class DoctorSchedule:
+    """Sorted blocking bookings of one doctor, updated as the batch is applied."""
+
+    def __init__(self, bookings):
+        bookings = sorted(bookings, key=lambda b: b[0])
+        self.times = [t for t, _ in bookings]
+        self.keys = [key for _, key in bookings]
+
+    def is_free(self, scheduled_time, ignore=None):
+        lo = bisect_left(self.times, scheduled_time - BOOKING_BUFFER)
+        hi = bisect_right(self.times, scheduled_time + BOOKING_BUFFER)
+        return all(key == ignore for key in self.keys[lo:hi])
+
+    def add(self, scheduled_time, key):
+        index = bisect_right(self.times, scheduled_time)
+        self.times.insert(index, scheduled_time)
+        self.keys.insert(index, key)
+
+    def remove(self, key):
+        if key in self.keys:
+            index = self.keys.index(key)
+            del self.times[index]
+            del self.keys[index]
+
+
+def apply_bulk_operations(operations):
+    """
+    Validate and apply a batch of create/reschedule operations.
+
+    Conflicts are checked against one bookings query per doctor plus the
+    operations accepted earlier in the same batch, and accepted rows are
+    written with ``bulk_create``/``bulk_update`` inside one transaction that
+    holds every affected doctor's schedule lock. Returns one result dict per
+    operation, in input order; invalid operations are reported and skipped.
+
+    Reschedule targets are re-read with ``select_for_update`` once the locks
+    are held, so a transition (complete, cancel, ...) that commits after the
+    first read is reported as a conflict instead of being overwritten.
+    """
+    results = [None] * len(operations)
+    valid = {}
+
+    for index, raw in enumerate(operations):
+        serializer = BulkOperationSerializer(data=raw)
+        if serializer.is_valid():
+            valid[index] = serializer.validated_data
+        else:
+            results[index] = error(index, raw, serializer.errors)
+
+    repeated = Counter(op["id"] for op in valid.values() if op["op"] == "reschedule")
+    repeated = sorted(pk for pk, n in repeated.items() if n > 1)
+    if repeated:
+        raise serializers.ValidationError(
+            {"operations": [f"Appointment {pk} is rescheduled more than once." for pk in repeated]}
+        )
+
+    reschedule_ids = {op["id"] for op in valid.values() if op["op"] == "reschedule"}
+    targets = Appointment.objects.in_bulk(reschedule_ids)
+    creates = [op for op in valid.values() if op["op"] == "create"]
+    known_doctors = set(
+        DoctorProfile.objects.filter(pk__in={op["doctor_id"] for op in creates}).values_list("pk", flat=True)
+    )
+    known_patients = set(
+        PatientProfile.objects.filter(pk__in={op["patient_id"] for op in creates}).values_list("pk", flat=True)
+    )
+
+    for index, op in list(valid.items()):
+        problem = None
+        if op["op"] == "create":
+            if op["doctor_id"] not in known_doctors:
+                problem = {"doctor_id": ["Doctor not found."]}
+            elif op["patient_id"] not in known_patients:
+                problem = {"patient_id": ["Patient not found."]}
+        else:
+            target = targets.get(op["id"])
+            if target is None:
+                problem = {"id": ["Appointment not found."]}
+            elif target.status not in RESCHEDULE.sources:
+                problem = not_reschedulable(target)
+            else:
+                op["doctor_id"] = target.doctor_id
+        if problem:
+            results[index] = error(index, operations[index], problem)
+            del valid[index]
+
+    by_doctor = defaultdict(list)
+    for op in valid.values():
+        by_doctor[op["doctor_id"]].append(op["scheduled_time"])
+
+    to_create = []
+    to_update = []
+    touched = []
+    with doctor_schedule_lock(*by_doctor):
+        targets = Appointment.objects.select_for_update().in_bulk(
+            [op["id"] for op in valid.values() if op["op"] == "reschedule"]
+        )
+        schedules = {}
+        for doctor_id, times in by_doctor.items():
+            bookings = Appointment.objects.filter(
+                doctor_id=doctor_id,
+                status__in=BLOCKING_STATUSES,
+                scheduled_time__gte=min(times) - BOOKING_BUFFER,
+                scheduled_time__lte=max(times) + BOOKING_BUFFER,
+            ).values_list("scheduled_time", "id")
+            schedules[doctor_id] = DoctorSchedule(bookings)
+
+        for index, op in sorted(valid.items()):
+            schedule = schedules[op["doctor_id"]]
+            if op["op"] == "create":
+                if not schedule.is_free(op["scheduled_time"]):
+                    results[index] = error(index, operations[index], UNAVAILABLE)
+                    continue
+                schedule.add(op["scheduled_time"], ("new", index))
+                to_create.append((index, Appointment(
+                    doctor_id=op["doctor_id"],
+                    patient_id=op["patient_id"],
+                    scheduled_time=op["scheduled_time"],
+                    status=op["status"],
+                    reason=op.get("reason"),
+                )))
+            else:
+                appointment = targets.get(op["id"])
+                if appointment is None:
+                    results[index] = error(index, operations[index], {"id": ["Appointment not found."]})
+                    continue
+                if appointment.status not in RESCHEDULE.sources:
+                    results[index] = error(index, operations[index], not_reschedulable(appointment))
+                    continue
+                if not schedule.is_free(op["scheduled_time"], ignore=appointment.pk):
+                    results[index] = error(index, operations[index], UNAVAILABLE)
+                    continue
+                touched.append((appointment.doctor_id, appointment.patient_id, appointment.scheduled_time))
+                schedule.remove(appointment.pk)
+                schedule.add(op["scheduled_time"], appointment.pk)
+                appointment.scheduled_time = op["scheduled_time"]
+                appointment.status = RESCHEDULE.target
+                appointment.started_at = None
+                appointment.completed_at = None
+                appointment.meet_link = None
+                to_update.append((index, appointment))
+
+        Appointment.objects.bulk_create([a for _, a in to_create])
+        Appointment.objects.bulk_update(
+            [a for _, a in to_update],
+            ["scheduled_time", "status", "started_at", "completed_at", "meet_link"],
+        )
+        rollups.touch(
+            touched
+            + [(a.doctor_id, a.patient_id, a.scheduled_time) for _, a in to_create + to_update]
+        )
+
+    for index, appointment in to_create:
+        results[index] = {"index": index, "op": "create", "ok": True, "id": appointment.pk}
+    for index, appointment in to_update:
+        results[index] = {"index": index, "op": "reschedule", "ok": True, "id": appointment.pk}
+    return results
+
+
+def error(index, raw, errors):
+    op = raw.get("op") if isinstance(raw, dict) else None
+    return {"index": index, "op": op, "ok": False, "errors": errors}
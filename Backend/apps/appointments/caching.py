@@ -0,0 +1,40 @@
+import time
+
+from django.core.cache import cache, caches
+
+
+def cached(key, builder, ttl, lock_timeout=30, wait=2.0):
+    """
+    Return ``builder()`` cached under ``key`` for ``ttl`` seconds, without stampedes.
+
+    Values are kept past their soft expiry. When an entry goes stale, the
+    one caller that wins ``cache.add`` on the lock key rebuilds it while
+    everybody else keeps serving the stale value. On a cold cache, other
+    callers poll for up to ``wait`` seconds before building it themselves.
+    The lock lives in the "coordination" cache, so culling cannot drop it.
+    """
+    entry = cache.get(key)
+    now = time.time()
+    if entry is not None and entry[0] > now:
+        return entry[1]
+
+    lock_key = f"{key}:lock"
+    locks = caches["coordination"]
+    if locks.add(lock_key, 1, lock_timeout):
+        try:
+            value = builder()
+            cache.set(key, (time.time() + ttl, value), ttl * 10)
+            return value
+        finally:
+            locks.delete(lock_key)
+
+    if entry is not None:
+        return entry[1]
+
+    deadline = now + wait
+    while time.time() < deadline:
+        time.sleep(0.05)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry[1]
+    return builder()
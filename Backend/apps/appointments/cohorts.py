@@ -0,0 +1,107 @@
+"""
+Per-doctor cohort statistics computed with NumPy.
+
+The appointment columns are streamed with ``values_list(...).iterator()``
+and packed chunk by chunk into flat arrays (times as epoch seconds, ``NaN``
+for missing values). Rates and percentiles are then computed for every
+doctor at once: one ``lexsort`` orders the values by ``(doctor, value)``
+and each percentile becomes an index lookup into that sorted array.
+"""
+from itertools import islice
+
+import numpy as np
+
+from .models import Appointment
+
+PERCENTILES = (50, 90, 95)
+STATUS_CODES = {status: code for code, (status, _) in enumerate(Appointment.STATUS_CHOICES)}
+COLUMNS = ("doctor_id", "status", "scheduled_time", "created_at", "started_at")
+
+
+def epoch(values):
+    return np.fromiter(
+        (value.timestamp() if value is not None else np.nan for value in values),
+        dtype=np.float64,
+        count=len(values),
+    )
+
+
+def load_columns(queryset, chunk_size=20000):
+    """Read ``COLUMNS`` of ``queryset`` into a dict of NumPy arrays, ``chunk_size`` rows at a time."""
+    rows = queryset.order_by().values_list(*COLUMNS).iterator(chunk_size=chunk_size)
+    chunks = {"doctor": [], "status": [], "scheduled": [], "created": [], "started": []}
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            break
+        doctor, status, scheduled, created, started = zip(*chunk)
+        chunks["doctor"].append(np.fromiter(doctor, dtype=np.int64, count=len(chunk)))
+        chunks["status"].append(np.fromiter((STATUS_CODES[s] for s in status), dtype=np.int8, count=len(chunk)))
+        chunks["scheduled"].append(epoch(scheduled))
+        chunks["created"].append(epoch(created))
+        chunks["started"].append(epoch(started))
+    empty = {"doctor": np.int64, "status": np.int8}
+    return {
+        name: np.concatenate(parts) if parts else np.empty(0, dtype=empty.get(name, np.float64))
+        for name, parts in chunks.items()
+    }
+
+
+def grouped_percentiles(groups, values, n_groups, percentiles=PERCENTILES):
+    """
+    Linear-interpolated percentiles of ``values`` per group, ignoring ``NaN``.
+
+    Returns an array of shape ``(n_groups, len(percentiles))``; groups without
+    values get ``NaN``. Matches ``np.percentile(..., method="linear")``.
+    """
+    present = ~np.isnan(values)
+    groups, values = groups[present], values[present]
+    order = np.lexsort((values, groups))
+    ordered = values[order]
+    counts = np.bincount(groups, minlength=n_groups)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+
+    result = np.full((n_groups, len(percentiles)), np.nan)
+    has_values = counts > 0
+    for column, q in enumerate(percentiles):
+        position = (counts[has_values] - 1) * (q / 100)
+        lower = np.floor(position).astype(np.int64)
+        upper = np.ceil(position).astype(np.int64)
+        base = starts[has_values]
+        low, high = ordered[base + lower], ordered[base + upper]
+        result[has_values, column] = low + (high - low) * (position - lower)
+    return result
+
+
+def cohort_stats(columns, percentiles=PERCENTILES):
+    """
+    Per-doctor no-show rate, booking lead time and start delay.
+
+    The no-show rate is ``missed / (missed + completed)``. Lead time is
+    ``scheduled_time - created_at`` in hours and start delay is
+    ``started_at - scheduled_time`` in minutes.
+    """
+    doctor_ids, groups = np.unique(columns["doctor"], return_inverse=True)
+    n = len(doctor_ids)
+    status = columns["status"]
+    total = np.bincount(groups, minlength=n)
+    missed = np.bincount(groups, weights=status == STATUS_CODES["missed"], minlength=n).astype(np.int64)
+    completed = np.bincount(groups, weights=status == STATUS_CODES["completed"], minlength=n).astype(np.int64)
+    lead = grouped_percentiles(groups, (columns["scheduled"] - columns["created"]) / 3600, n, percentiles)
+    delay = grouped_percentiles(groups, (columns["started"] - columns["scheduled"]) / 60, n, percentiles)
+
+    def summary(row):
+        return {f"p{q}": None if np.isnan(v) else round(float(v), 2) for q, v in zip(percentiles, row)}
+
+    return [
+        {
+            "doctor_id": int(doctor_ids[i]),
+            "appointments": int(total[i]),
+            "completed": int(completed[i]),
+            "missed": int(missed[i]),
+            "no_show_rate": round(float(missed[i] / (missed[i] + completed[i])), 4) if missed[i] + completed[i] else None,
+            "lead_time_hours": summary(lead[i]),
+            "start_delay_minutes": summary(delay[i]),
+        }
+        for i in range(n)
+    ]
@@ -0,0 +1,135 @@
+import hashlib
+import json
+import time
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Count, Q
+from django.utils.http import quote_etag
+
+from apps.users.models import DoctorProfile
+
+from .models import DoctorSearchTerm
+
+VERSION_KEY = "doctor-directory:version"
+# Result field -> column; a sparse fieldset without names skips the user join.
+DIRECTORY_COLUMNS = {
+    "id": "id",
+    "username": "user__username",
+    "first_name": "user__first_name",
+    "last_name": "user__last_name",
+    "specialization": "specialization",
+}
+
+
+def directory_version():
+    """
+    Current directory version, shared by every worker through the
+    "coordination" cache, where culling cannot drop it.
+
+    The version is the nanosecond timestamp of the last invalidation, so it
+    doubles as the directory's Last-Modified time.
+    """
+    coordination = caches["coordination"]
+    version = coordination.get(VERSION_KEY)
+    if version is None:
+        coordination.add(VERSION_KEY, time.time_ns(), None)
+        version = coordination.get(VERSION_KEY)
+    return version
+
+
+def invalidate_directory():
+    caches["coordination"].set(VERSION_KEY, time.time_ns(), None)
+
+
+def search_terms(username, first_name, last_name, specialization):
+    """The indexed terms of one doctor: whole names plus each word of the specialization."""
+    terms = {username.lower(), first_name.lower(), last_name.lower(), *specialization.lower().split()}
+    terms.discard("")
+    return terms
+
+
+def index_doctors(doctor_ids):
+    """Rebuild the ``DoctorSearchTerm`` rows of ``doctor_ids``."""
+    doctor_ids = set(doctor_ids)
+    DoctorSearchTerm.objects.filter(doctor_id__in=doctor_ids).delete()
+    rows = DoctorProfile.objects.filter(pk__in=doctor_ids).values_list(
+        "id", "user__username", "user__first_name", "user__last_name", "specialization"
+    )
+    DoctorSearchTerm.objects.bulk_create(
+        [
+            DoctorSearchTerm(doctor_id=doctor_id, term=term)
+            for doctor_id, *fields in rows
+            for term in search_terms(*fields)
+        ],
+        batch_size=1000,
+    )
+
+
+def search_filter(q):
+    """
+    Every whitespace-separated token must prefix-match a name or a word of
+    the specialization, case-insensitively.
+
+    Each token is a ``term >= token AND term < token + U+10FFFF`` range on
+    the ``DoctorSearchTerm`` index. A case-insensitive ``LIKE``/``istartswith``
+    cannot use an ordinary index on SQLite.
+    """
+    condition = Q()
+    for token in q.lower().split():
+        matching = DoctorSearchTerm.objects.filter(term__gte=token, term__lt=token + "\U0010ffff")
+        condition &= Q(id__in=matching.values("doctor_id"))
+    return condition
+
+
+def build_directory(q="", specialization="", page=1, page_size=50, fields=None):
+    fields = fields or list(DIRECTORY_COLUMNS)
+    matching = DoctorProfile.objects.filter(search_filter(q))
+    facets = [
+        {"value": row["specialization"], "count": row["count"]}
+        for row in matching.order_by("specialization").values("specialization").annotate(count=Count("id"))
+    ]
+
+    if specialization:
+        matching = matching.filter(specialization=specialization)
+        count = next((f["count"] for f in facets if f["value"] == specialization), 0)
+    else:
+        count = sum(f["count"] for f in facets)
+
+    offset = (page - 1) * page_size
+    rows = (
+        matching.order_by("id")
+        .values(*(DIRECTORY_COLUMNS[name] for name in fields))
+        [offset:offset + page_size]
+    )
+    return {
+        "count": count,
+        "results": [{name: row[DIRECTORY_COLUMNS[name]] for name in fields} for row in rows],
+        "facets": {"specialization": facets},
+    }
+
+
+def get_directory(q="", specialization="", page=1, page_size=50, fields=None):
+    """
+    One page of the doctor directory with its validators, as a dict with
+    ``data``, ``etag`` and ``last_modified`` (epoch seconds).
+
+    Entries are cached per query under the current version, so an
+    invalidation from any process makes every worker rebuild on its next
+    request.
+    """
+    version = directory_version()
+    params = json.dumps([q.strip().lower(), specialization, page, page_size, fields])
+    key = f"doctor-directory:{version}:{hashlib.sha256(params.encode('utf-8')).hexdigest()}"
+    entry = cache.get(key)
+    if entry is None:
+        data = build_directory(q.strip(), specialization, page, page_size, fields)
+        body = json.dumps(data, sort_keys=True, cls=DjangoJSONEncoder).encode("utf-8")
+        entry = {
+            "data": data,
+            "etag": quote_etag(hashlib.sha256(body).hexdigest()),
+            "last_modified": version // 10**9,
+        }
+        cache.set(key, entry, getattr(settings, "DOCTOR_DIRECTORY_CACHE_SECONDS", 3600))
+    return entry
@@ -0,0 +1,130 @@
+"""
+Delivery of stored files once the caller has been authorized.
+
+``PRESCRIPTION_DELIVERY`` picks how the bytes leave the server:
+
+* ``"direct"`` (default): Django serves the file itself, honouring single
+  ``Range`` requests (206/416), ``If-Range`` and ``Content-Length``.
+* ``"x-accel-redirect"``: nginx serves ``PRESCRIPTION_ACCEL_PREFIX + name``
+  from an ``internal`` location that maps onto ``MEDIA_ROOT``.
+* ``"x-sendfile"``: Apache (mod_xsendfile) or lighttpd serves the absolute path.
+
+Every mode sends an ``ETag`` and ``Last-Modified`` and answers conditional
+requests with 304 before touching the file, so repeat downloads are cheap.
+A 416 carries only ``Content-Range: bytes */<size>``.
+"""
+import hashlib
+import mimetypes
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import content_disposition_header, http_date, parse_etags
+
+DELIVERY_MODES = ("direct", "x-accel-redirect", "x-sendfile")
+BLOCK_SIZE = 64 * 1024
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def file_etag(name, size, modified):
+    digest = hashlib.sha256(f"{name}:{size}:{modified.timestamp()}".encode()).hexdigest()[:32]
+    return f'"{digest}"'
+
+
+def parse_range(header, size):
+    """
+    Parse a single-range ``bytes=`` header into an inclusive ``(start, end)``.
+
+    Returns ``None`` when the header should be ignored (absent, malformed or
+    multi-range, all of which fall back to a full 200) and raises
+    ``ValueError`` when the range cannot be satisfied.
+    """
+    match = RANGE_RE.match(header.strip()) if header else None
+    if not match or match.groups() == ("", ""):
+        return None
+    first, last = match.groups()
+    if first and last and int(last) < int(first):
+        return None
+    if size == 0 or (first and int(first) >= size) or (not first and int(last) == 0):
+        raise ValueError("Range not satisfiable.")
+    if not first:
+        return max(size - int(last), 0), size - 1
+    return int(first), (min(int(last), size - 1) if last else size - 1)
+
+
+def read_range(storage, name, start, end):
+    with storage.open(name, "rb") as handle:
+        handle.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            block = handle.read(min(BLOCK_SIZE, remaining))
+            if not block:
+                break
+            remaining -= len(block)
+            yield block
+
+
+def serve_file(request, storage, name, filename):
+    """Return a response delivering ``name`` from ``storage`` as an attachment called ``filename``."""
+    mode = getattr(settings, "PRESCRIPTION_DELIVERY", "direct")
+    if mode not in DELIVERY_MODES:
+        raise ImproperlyConfigured(f"PRESCRIPTION_DELIVERY must be one of {', '.join(DELIVERY_MODES)}.")
+    if not storage.exists(name):
+        raise Http404("File not available")
+
+    size = storage.size(name)
+    modified = storage.get_modified_time(name)
+    etag = file_etag(name, size, modified)
+    last_modified = int(modified.timestamp())
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = build_response(request, storage, name, size, etag, mode)
+        if response.status_code == 416:
+            return response
+        content_type, _ = mimetypes.guess_type(filename)
+        response["Content-Type"] = content_type or "application/octet-stream"
+        response["Content-Disposition"] = content_disposition_header(True, filename)
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(last_modified)
+    response["Accept-Ranges"] = "bytes"
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def build_response(request, storage, name, size, etag, mode):
+    if mode == "x-accel-redirect":
+        response = HttpResponse()
+        prefix = getattr(settings, "PRESCRIPTION_ACCEL_PREFIX", "/protected/")
+        response["X-Accel-Redirect"] = prefix + quote(name)
+        return response
+    if mode == "x-sendfile":
+        response = HttpResponse()
+        response["X-Sendfile"] = storage.path(name)
+        return response
+
+    range_header = request.META.get("HTTP_RANGE")
+    if_range = request.META.get("HTTP_IF_RANGE")
+    # A stale If-Range validator means the client's partial copy is outdated.
+    if if_range and etag not in parse_etags(if_range):
+        range_header = None
+    try:
+        byte_range = parse_range(range_header, size)
+    except ValueError:
+        # Only the size: the empty body is not the file.
+        response = HttpResponse(status=416)
+        del response["Content-Type"]
+        response["Content-Range"] = f"bytes */{size}"
+        return response
+
+    if byte_range is None:
+        return FileResponse(storage.open(name, "rb"))
+
+    start, end = byte_range
+    response = StreamingHttpResponse(read_range(storage, name, start, end), status=206)
+    response["Content-Range"] = f"bytes {start}-{end}/{size}"
+    response["Content-Length"] = str(end - start + 1)
+    return response
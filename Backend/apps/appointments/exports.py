@@ -0,0 +1,84 @@
+"""
+Streaming CSV and NDJSON exports.
+
+Rows come from ``QuerySet.values(...).iterator(chunk_size=...)``, so memory
+stays flat whatever the row count. They are encoded a batch at a time into a
+``StreamingHttpResponse``; the CSV header goes out before the first query
+batch is read.
+"""
+import csv
+import json
+
+from django.http import StreamingHttpResponse
+from rest_framework.utils.encoders import JSONEncoder
+
+CONTENT_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson; charset=utf-8",
+}
+
+_encoder = JSONEncoder()
+
+
+class Echo:
+    """File-like object whose ``write`` hands the line back to ``csv.writer``."""
+
+    def write(self, value):
+        return value
+
+
+def flatten(row, prefix=""):
+    """Nested dicts become dotted columns: ``{"a": {"b": 1}}`` -> ``{"a.b": 1}``."""
+    flat = {}
+    for key, value in row.items():
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{prefix}{key}."))
+        else:
+            flat[f"{prefix}{key}"] = value
+    return flat
+
+
+def csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, (str, int, float)):
+        return value
+    if isinstance(value, (list, tuple)):
+        return "; ".join(str(item) for item in value)
+    return _encoder.default(value)
+
+
+def csv_chunks(rows, fields, batch_size=500):
+    writer = csv.writer(Echo())
+    yield writer.writerow(fields)
+    batch = []
+    for row in rows:
+        batch.append(writer.writerow([csv_value(row.get(field)) for field in fields]))
+        if len(batch) == batch_size:
+            yield "".join(batch)
+            batch = []
+    if batch:
+        yield "".join(batch)
+
+
+def ndjson_chunks(rows, fields=None, batch_size=500):
+    batch = []
+    for row in rows:
+        batch.append(json.dumps(row, cls=JSONEncoder, separators=(",", ":")) + "\n")
+        if len(batch) == batch_size:
+            yield "".join(batch)
+            batch = []
+    if batch:
+        yield "".join(batch)
+
+
+CHUNKERS = {"csv": csv_chunks, "ndjson": ndjson_chunks}
+
+
+def streaming_export(rows, fields, export_format, filename):
+    response = StreamingHttpResponse(
+        CHUNKERS[export_format](rows, fields),
+        content_type=CONTENT_TYPES[export_format],
+    )
+    response["Content-Disposition"] = f'attachment; filename="{filename}.{export_format}"'
+    return response
@@ -0,0 +1,160 @@
+"""
+Read-only fast path for appointment list responses.
+
+``AppointmentSerializer`` runs DRF's field machinery for every row, and the
+nested doctor/patient serializers build their ``user`` dicts through
+``SerializerMethodField``s. List responses get the same JSON from a flat
+``values()`` projection instead: the joins happen in one query, no model
+instances are created, and each row is reshaped by a plain dict literal.
+``manage.py check_appointment_fastpath`` asserts the rendered output is
+byte-identical to the serializer's.
+
+``?shape=normalized`` drops the repeated nested objects altogether: rows
+reference doctors and patients by id and each one is listed once beside
+the page.
+"""
+from itertools import chain
+from operator import itemgetter
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+
+USER_FIELDS = ("id", "username", "first_name", "last_name")
+FIELD_COLUMNS = {
+    "id": ("id",),
+    "patient": ("patient_id", *(f"patient__user__{name}" for name in USER_FIELDS)),
+    "doctor": ("doctor_id", *(f"doctor__user__{name}" for name in USER_FIELDS), "doctor__specialization"),
+    "scheduled_time": ("scheduled_time",),
+    "status": ("status",),
+    "reason": ("reason",),
+    "created_at": ("created_at",),
+    "meet_link": ("meet_link",),
+    "started_at": ("started_at",),
+    "completed_at": ("completed_at",),
+}
+COLUMNS = tuple(chain.from_iterable(FIELD_COLUMNS.values()))
+# AppointmentCursorPagination positions pages by these, whatever is output.
+CURSOR_COLUMNS = ("id", "scheduled_time")
+
+
+def appointment_values(queryset, fields=None):
+    """``values()`` projection for ``fields`` (a sparse fieldset), or for every field."""
+    if fields is None:
+        return queryset.values(*COLUMNS)
+    columns = chain(CURSOR_COLUMNS, *(FIELD_COLUMNS[name] for name in fields))
+    return queryset.values(*dict.fromkeys(columns))
+
+
+def datetime_formatter():
+    """``DateTimeField().to_representation`` with the output timezone resolved once."""
+    output_format = api_settings.DATETIME_FORMAT
+    if not settings.USE_TZ or not isinstance(output_format, str) or output_format.lower() != ISO_8601:
+        return serializers.DateTimeField().to_representation
+    tz = timezone.get_current_timezone()
+
+    def to_representation(value):
+        if value is None:
+            return None
+        value = value.astimezone(tz).isoformat()
+        return value[:-6] + "Z" if value.endswith("+00:00") else value
+
+    return to_representation
+
+
+def patient_entry(row):
+    return {
+        "id": row["patient_id"],
+        "user": {
+            "id": row["patient__user__id"],
+            "username": row["patient__user__username"],
+            "first_name": row["patient__user__first_name"],
+            "last_name": row["patient__user__last_name"],
+        },
+    }
+
+
+def doctor_entry(row):
+    return {
+        "id": row["doctor_id"],
+        "user": {
+            "id": row["doctor__user__id"],
+            "username": row["doctor__user__username"],
+            "first_name": row["doctor__user__first_name"],
+            "last_name": row["doctor__user__last_name"],
+        },
+        "specialization": row["doctor__specialization"],
+    }
+
+
+def field_builders(fields, dt, normalized=False):
+    """``(key, row -> value)`` pairs producing ``fields``; normalized rows reference patient/doctor by id."""
+    builders = {
+        "id": ("id", itemgetter("id")),
+        "patient": ("patient", patient_entry),
+        "doctor": ("doctor", doctor_entry),
+        "scheduled_time": ("scheduled_time", lambda row: dt(row["scheduled_time"])),
+        "status": ("status", itemgetter("status")),
+        "reason": ("reason", itemgetter("reason")),
+        "created_at": ("created_at", lambda row: dt(row["created_at"])),
+        "meet_link": ("meet_link", itemgetter("meet_link")),
+        "started_at": ("started_at", lambda row: dt(row["started_at"])),
+        "completed_at": ("completed_at", lambda row: dt(row["completed_at"])),
+    }
+    if normalized:
+        builders["patient"] = ("patient_id", itemgetter("patient_id"))
+        builders["doctor"] = ("doctor_id", itemgetter("doctor_id"))
+    return [builders[name] for name in fields]
+
+
+def appointment_rows(rows, fields=None):
+    """Build ``AppointmentSerializer(many=True).data`` from ``appointment_values()`` rows."""
+    dt = datetime_formatter()
+    if fields is not None:
+        builders = field_builders(fields, dt)
+        return [{key: build(row) for key, build in builders} for row in rows]
+    return [
+        {
+            "id": row["id"],
+            "patient": patient_entry(row),
+            "doctor": doctor_entry(row),
+            "scheduled_time": dt(row["scheduled_time"]),
+            "status": row["status"],
+            "reason": row["reason"],
+            "created_at": dt(row["created_at"]),
+            "meet_link": row["meet_link"],
+            "started_at": dt(row["started_at"]),
+            "completed_at": dt(row["completed_at"]),
+        }
+        for row in rows
+    ]
+
+
+def normalized_appointment_rows(rows, fields=None):
+    """
+    The ``?shape=normalized`` form of ``appointment_rows()``.
+
+    Appointments carry ``patient_id``/``doctor_id`` and every referenced
+    patient and doctor appears once in the ``patients``/``doctors`` side
+    tables, in the same shape as the nested objects. Returns
+    ``(results, side_tables)``; a sparse fieldset without ``doctor`` or
+    ``patient`` also drops that side table.
+    """
+    fields = list(FIELD_COLUMNS) if fields is None else fields
+    builders = field_builders(fields, datetime_formatter(), normalized=True)
+    tables = {
+        table: ({}, id_column, entry)
+        for field, table, id_column, entry in (
+            ("doctor", "doctors", "doctor_id", doctor_entry),
+            ("patient", "patients", "patient_id", patient_entry),
+        )
+        if field in fields
+    }
+    results = []
+    for row in rows:
+        for entries, id_column, entry in tables.values():
+            if row[id_column] not in entries:
+                entries[row[id_column]] = entry(row)
+        results.append({key: build(row) for key, build in builders})
+    return results, {table: list(entries.values()) for table, (entries, _, _) in tables.items()}
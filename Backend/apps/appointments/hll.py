@@ -0,0 +1,96 @@
+"""
+A small HyperLogLog cardinality sketch.
+
+With ``p = 12`` a sketch is 4096 one-byte registers and estimates distinct
+counts with a standard error of about ``1.04 / sqrt(4096)``, roughly 1.6%.
+Adding a value is idempotent, and two sketches merge losslessly by taking
+the register-wise maximum. That lets per-month sketches be combined into
+any month range. Counts use Ertl's improved raw estimator ("New
+cardinality estimation algorithms for HyperLogLog sketches", 2017). It
+stays unbiased through the mid range, where the classic estimator needs
+empirical bias tables.
+"""
+import hashlib
+
+import numpy as np
+
+PRECISION = 12
+REGISTERS = 1 << PRECISION
+STANDARD_ERROR = 1.04 / REGISTERS ** 0.5
+_WIDTH = 64 - PRECISION
+_ALPHA_INF = 1 / (2 * np.log(2))
+
+
+def _sigma(x):
+    if x == 1:
+        return float("inf")
+    y, z = 1.0, x
+    while True:
+        x *= x
+        previous = z
+        z += x * y
+        y += y
+        if z == previous:
+            return z
+
+
+def _tau(x):
+    if x in (0, 1):
+        return 0.0
+    y, z = 1.0, 1 - x
+    while True:
+        x = x ** 0.5
+        previous = z
+        y *= 0.5
+        z -= (1 - x) ** 2 * y
+        if z == previous:
+            return z / 3
+
+
+def _hash(value):
+    return int.from_bytes(hashlib.blake2b(str(value).encode(), digest_size=8).digest(), "big")
+
+
+class HyperLogLog:
+    def __init__(self, registers=None):
+        if registers is None:
+            self.registers = np.zeros(REGISTERS, dtype=np.uint8)
+        else:
+            self.registers = np.frombuffer(bytes(registers), dtype=np.uint8).copy()
+            if len(self.registers) != REGISTERS:
+                raise ValueError(f"Expected {REGISTERS} registers, got {len(self.registers)}.")
+
+    def add(self, value):
+        h = _hash(value)
+        index = h >> _WIDTH
+        rank = _WIDTH - (h & ((1 << _WIDTH) - 1)).bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def update(self, values):
+        for value in values:
+            self.add(value)
+        return self
+
+    def merge(self, other):
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    @classmethod
+    def union(cls, sketches):
+        result = cls()
+        for sketch in sketches:
+            result.merge(sketch)
+        return result
+
+    def count(self):
+        histogram = np.bincount(self.registers, minlength=_WIDTH + 2)
+        m = REGISTERS
+        z = m * _tau(1 - histogram[_WIDTH + 1] / m)
+        for k in range(_WIDTH, 0, -1):
+            z = 0.5 * (z + histogram[k])
+        z += m * _sigma(histogram[0] / m)
+        return int(round(_ALPHA_INF * m * m / z))
+
+    def to_bytes(self):
+        return self.registers.tobytes()
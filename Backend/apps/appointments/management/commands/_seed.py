@@ -0,0 +1,76 @@
+import random
+from datetime import timedelta
+
+from django.utils import timezone
+
+from apps.appointments.directory import index_doctors
+from apps.appointments.models import Appointment
+from apps.users.models import DoctorProfile, PatientProfile, User
+
+SPECIALIZATIONS = [
+    "Cardiology",
+    "Dermatology",
+    "General Medicine",
+    "Neurology",
+    "Orthopedics",
+    "Pediatrics",
+    "Psychiatry",
+]
+
+STATUSES = ["requested", "confirmed", "completed", "cancelled", "pending", "missed"]
+
+
+def seed_clinic(doctors=20, patients=200, appointments=2000, days=180, prefix="seed", rng=None):
+    """
+    Bulk-insert a synthetic clinic for benchmarks and query-plan checks.
+
+    Callers are expected to run this inside ``transaction.atomic()`` and roll
+    back afterwards. Returns ``(doctor_profiles, patient_profiles)``.
+    """
+    rng = rng or random.Random(42)
+    now = timezone.now()
+
+    users = User.objects.bulk_create(
+        [
+            User(username=f"{prefix}-doctor-{i}", first_name="Doc", last_name=str(i), is_doctor=True)
+            for i in range(doctors)
+        ]
+        + [
+            User(username=f"{prefix}-patient-{i}", first_name="Pat", last_name=str(i), is_patient=True)
+            for i in range(patients)
+        ]
+    )
+    doctor_profiles = DoctorProfile.objects.bulk_create(
+        [
+            DoctorProfile(user=user, specialization=SPECIALIZATIONS[i % len(SPECIALIZATIONS)])
+            for i, user in enumerate(users[:doctors])
+        ]
+    )
+    index_doctors(profile.pk for profile in doctor_profiles)
+    patient_profiles = PatientProfile.objects.bulk_create(
+        [PatientProfile(user=user) for user in users[doctors:]]
+    )
+
+    span = int(timedelta(days=days).total_seconds())
+    rows = []
+    for _ in range(appointments):
+        scheduled_time = now + timedelta(seconds=rng.randrange(-span, span))
+        status = rng.choice(STATUSES)
+        started_at = scheduled_time + timedelta(minutes=rng.randrange(-5, 25)) if status == "completed" else None
+        rows.append(
+            Appointment(
+                doctor=rng.choice(doctor_profiles),
+                patient=rng.choice(patient_profiles),
+                scheduled_time=scheduled_time,
+                status=status,
+                reason="Seeded appointment",
+                started_at=started_at,
+                completed_at=started_at + timedelta(minutes=20) if started_at else None,
+            )
+        )
+        # Flush as we go so million-row seeds do not hold every instance.
+        if len(rows) == 10000:
+            Appointment.objects.bulk_create(rows, batch_size=1000)
+            rows = []
+    Appointment.objects.bulk_create(rows, batch_size=1000)
+    return doctor_profiles, patient_profiles
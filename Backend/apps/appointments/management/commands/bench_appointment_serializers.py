@@ -0,0 +1,54 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from apps.appointments.fastpath import appointment_rows, appointment_values, normalized_appointment_rows
+from apps.appointments.models import Appointment
+from apps.appointments.serializers import AppointmentSerializer
+
+from ._seed import seed_clinic
+
+
+def normalized(rows):
+    results, side_tables = normalized_appointment_rows(rows)
+    return {"results": results, **side_tables}
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a throwaway clinic and time rendering appointment lists through "
+        "AppointmentSerializer, the values() fast path and its normalized "
+        "shape, including the query and JSON rendering. Everything is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000])
+        parser.add_argument("--repeat", type=int, default=3)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            seed_clinic(doctors=50, patients=2000, appointments=max(options["rows"]), prefix="serializerbench")
+            queryset = Appointment.objects.select_related("patient__user", "doctor__user").order_by("-scheduled_time", "-id")
+            renderer = JSONRenderer()
+            variants = {
+                "serializer": lambda rows: renderer.render(AppointmentSerializer(queryset[:rows], many=True).data),
+                "fast path": lambda rows: renderer.render(appointment_rows(appointment_values(queryset[:rows]))),
+                "normalized": lambda rows: renderer.render(normalized(appointment_values(queryset[:rows]))),
+            }
+            for rows in options["rows"]:
+                timings = {}
+                for label, render in variants.items():
+                    best = None
+                    for _ in range(options["repeat"]):
+                        started = time.perf_counter()
+                        payload = render(rows)
+                        elapsed = time.perf_counter() - started
+                        best = elapsed if best is None else min(best, elapsed)
+                    timings[label] = best
+                    self.stdout.write(
+                        f"{rows:>7} rows  {label:<11} {best * 1000:9.1f} ms  {len(payload) / 1024:9.1f} KiB"
+                        f"  {timings['serializer'] / best:5.1f}x"
+                    )
+            transaction.set_rollback(True)
@@ -0,0 +1,107 @@
+import math
+import time
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from apps.appointments.cohorts import COLUMNS, PERCENTILES, cohort_stats, load_columns
+from apps.appointments.models import Appointment
+
+from ._seed import seed_clinic
+
+
+def percentile(ordered, q):
+    position = (len(ordered) - 1) * q / 100
+    lower, upper = math.floor(position), math.ceil(position)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def cohort_stats_loop(rows):
+    """Per-row reference implementation of ``cohort_stats``."""
+    groups = defaultdict(lambda: {"appointments": 0, "completed": 0, "missed": 0, "lead": [], "delay": []})
+    for doctor_id, status, scheduled, created, started in rows:
+        group = groups[doctor_id]
+        group["appointments"] += 1
+        if status in ("completed", "missed"):
+            group[status] += 1
+        group["lead"].append((scheduled - created).total_seconds() / 3600)
+        if started is not None:
+            group["delay"].append((started - scheduled).total_seconds() / 60)
+
+    def summary(values):
+        values.sort()
+        return {f"p{q}": round(percentile(values, q), 2) if values else None for q in PERCENTILES}
+
+    result = []
+    for doctor_id in sorted(groups):
+        group = groups[doctor_id]
+        decided = group["missed"] + group["completed"]
+        result.append({
+            "doctor_id": doctor_id,
+            "appointments": group["appointments"],
+            "completed": group["completed"],
+            "missed": group["missed"],
+            "no_show_rate": round(group["missed"] / decided, 4) if decided else None,
+            "lead_time_hours": summary(group["lead"]),
+            "start_delay_minutes": summary(group["delay"]),
+        })
+    return result
+
+
+def matches(a, b, tolerance=0.011):
+    if isinstance(a, dict):
+        return a.keys() == b.keys() and all(matches(a[k], b[k], tolerance) for k in a)
+    if isinstance(a, list):
+        return len(a) == len(b) and all(matches(x, y, tolerance) for x, y in zip(a, b))
+    if isinstance(a, float) and isinstance(b, float):
+        return abs(a - b) <= tolerance
+    return a == b
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a throwaway clinic, compute per-doctor cohort statistics with the "
+        "NumPy implementation and with a per-row Python loop, check they agree "
+        "and report timings. Everything is rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--appointments", type=int, default=1_000_000)
+        parser.add_argument("--doctors", type=int, default=50)
+        parser.add_argument("--patients", type=int, default=5000)
+        parser.add_argument("--chunk-size", type=int, default=20000)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            started = time.perf_counter()
+            seed_clinic(
+                doctors=options["doctors"],
+                patients=options["patients"],
+                appointments=options["appointments"],
+                prefix="cohortbench",
+            )
+            self.stdout.write(f"seeded {options['appointments']} appointments in {time.perf_counter() - started:.1f}s")
+            queryset = Appointment.objects.all()
+
+            started = time.perf_counter()
+            columns = load_columns(queryset, chunk_size=options["chunk_size"])
+            loaded = time.perf_counter()
+            vectorized = cohort_stats(columns)
+            numpy_done = time.perf_counter()
+
+            rows = list(queryset.order_by().values_list(*COLUMNS).iterator(chunk_size=options["chunk_size"]))
+            fetched = time.perf_counter()
+            looped = cohort_stats_loop(rows)
+            loop_done = time.perf_counter()
+
+            transaction.set_rollback(True)
+
+        self.stdout.write(
+            f"numpy: load {loaded - started:.2f}s + compute {numpy_done - loaded:.3f}s\n"
+            f"loop:  load {fetched - numpy_done:.2f}s + compute {loop_done - fetched:.3f}s\n"
+            f"compute speedup: {(loop_done - fetched) / (numpy_done - loaded):.1f}x"
+        )
+        if not matches(vectorized, looped):
+            raise CommandError("NumPy and per-row results differ.")
+        self.stdout.write(self.style.SUCCESS(f"Results agree for {len(vectorized)} doctors."))
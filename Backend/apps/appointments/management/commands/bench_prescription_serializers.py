@@ -0,0 +1,71 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.renderers import JSONRenderer
+
+from apps.appointments.models import Appointment, Prescription
+from apps.appointments.serializers import PrescriptionListSerializer, PrescriptionSerializer
+
+from ._seed import seed_clinic
+
+VARIANTS = {
+    # The list as it was served before: nested serializer, partial select_related.
+    "nested (before)": (
+        PrescriptionSerializer,
+        ("appointment__patient__user", "uploaded_by__user"),
+    ),
+    "nested, ?expand=appointment": (
+        PrescriptionSerializer,
+        ("appointment__doctor__user", "appointment__patient__user", "uploaded_by__user"),
+    ),
+    "compact list": (
+        PrescriptionListSerializer,
+        ("appointment__doctor__user",),
+    ),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a throwaway clinic with prescriptions and compare serialization "
+        "time, query count and payload size of the nested and compact "
+        "prescription list representations. Everything is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--prescriptions", type=int, default=2000)
+        parser.add_argument("--repeat", type=int, default=3)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            seed_clinic(
+                doctors=20, patients=200, appointments=options["prescriptions"], prefix="prescbench"
+            )
+            Prescription.objects.bulk_create(
+                [
+                    Prescription(
+                        appointment_id=appointment_id,
+                        uploaded_by_id=doctor_id,
+                        file=f"prescriptions/{appointment_id:064x}.pdf",
+                        notes="Seeded prescription",
+                    )
+                    for appointment_id, doctor_id in Appointment.objects.values_list("id", "doctor_id")
+                ],
+                batch_size=1000,
+            )
+
+            for label, (serializer_class, related) in VARIANTS.items():
+                best = None
+                for _ in range(options["repeat"]):
+                    queryset = Prescription.objects.select_related(*related).order_by("-created_at", "-id")
+                    with CaptureQueriesContext(connection) as queries:
+                        started = time.perf_counter()
+                        payload = JSONRenderer().render(serializer_class(queryset, many=True).data)
+                        elapsed = time.perf_counter() - started
+                    best = elapsed if best is None else min(best, elapsed)
+                self.stdout.write(
+                    f"{label:<28} {best * 1000:8.1f} ms  {len(queries):>5} queries  {len(payload) / 1024:9.1f} KiB"
+                )
+            transaction.set_rollback(True)
@@ -0,0 +1,73 @@
+import io
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from apps.appointments.directory import build_directory
+from apps.appointments.fastpath import appointment_rows, appointment_values
+from apps.appointments.models import Appointment
+from apps.appointments.serializers import AppointmentSerializer
+from backend.parsers import MessagePackParser, ORJSONParser
+from backend.renderers import MessagePackRenderer, ORJSONRenderer
+
+from ._seed import seed_clinic
+
+VARIANTS = {
+    "json (stdlib)": (JSONRenderer, JSONParser),
+    "orjson": (ORJSONRenderer, ORJSONParser),
+    "msgpack": (MessagePackRenderer, MessagePackParser),
+}
+
+
+def best_of(repeat, func):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a throwaway clinic and compare rendering and parsing time and "
+        "payload size of the stdlib JSON, orjson and MessagePack renderers on "
+        "appointment lists and the doctor directory. Fails if any renderer "
+        "produces a different document. Everything is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=5000)
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            seed_clinic(doctors=200, patients=2000, appointments=options["rows"], prefix="rendererbench")
+            queryset = Appointment.objects.select_related("patient__user", "doctor__user").order_by("-scheduled_time", "-id")
+            payloads = {
+                "appointments (serializer)": AppointmentSerializer(queryset, many=True).data,
+                "appointments (fast path)": appointment_rows(appointment_values(queryset)),
+                "doctor directory": build_directory(page_size=200),
+            }
+            transaction.set_rollback(True)
+
+        for name, data in payloads.items():
+            self.stdout.write(name)
+            reference = json.loads(JSONRenderer().render(data))
+            for label, (renderer_class, parser_class) in VARIANTS.items():
+                rendered, body = best_of(options["repeat"], lambda: renderer_class().render(data))
+                parsed, document = best_of(
+                    options["repeat"], lambda: parser_class().parse(io.BytesIO(body), parser_class.media_type, {})
+                )
+                if document != reference:
+                    raise CommandError(f"{label} renders a different {name} document.")
+                self.stdout.write(
+                    f"  {label:<14} render {rendered * 1000:8.2f} ms  parse {parsed * 1000:8.2f} ms"
+                    f"  {len(body) / 1024:9.1f} KiB"
+                )
+        self.stdout.write(self.style.SUCCESS("All renderers produce the same documents."))
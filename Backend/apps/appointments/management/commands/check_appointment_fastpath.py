@@ -0,0 +1,72 @@
+import random
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from apps.appointments.fastpath import appointment_rows, appointment_values
+from apps.appointments.models import Appointment
+from apps.appointments.serializers import AppointmentSerializer
+
+from ._seed import seed_clinic
+
+TIMEZONES = ("UTC", "Asia/Kolkata", "America/St_Johns")
+FIELDSETS = (["id", "status", "scheduled_time"], ["doctor", "reason", "started_at"], ["patient", "meet_link"])
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a throwaway clinic with varied appointments and fail unless the "
+        "values() fast path renders byte-identical JSON to AppointmentSerializer "
+        "in several timezones and for sparse fieldsets. Everything is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--appointments", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        rng = random.Random(22)
+        with transaction.atomic():
+            seed_clinic(doctors=10, patients=50, appointments=options["appointments"], prefix="fastpath", rng=rng)
+            self.vary(rng)
+            queryset = Appointment.objects.select_related("patient__user", "doctor__user").order_by("-scheduled_time", "-id")
+            renderer = JSONRenderer()
+            for name in TIMEZONES:
+                with timezone.override(name):
+                    expected = renderer.render(AppointmentSerializer(queryset, many=True).data)
+                    actual = renderer.render(appointment_rows(appointment_values(queryset)))
+                if actual != expected:
+                    position = next(i for i, (a, b) in enumerate(zip(actual, expected)) if a != b)
+                    raise CommandError(
+                        f"Fast path differs in {name} at byte {position}:\n"
+                        f"  serializer: {expected[max(position - 80, 0):position + 80]!r}\n"
+                        f"  fast path:  {actual[max(position - 80, 0):position + 80]!r}"
+                    )
+                self.stdout.write(f"{name:<18} {len(expected):>9} bytes identical")
+
+            full = AppointmentSerializer(queryset, many=True).data
+            for fields in FIELDSETS:
+                expected = renderer.render([{name: row[name] for name in fields} for row in full])
+                if renderer.render(appointment_rows(appointment_values(queryset, fields), fields)) != expected:
+                    raise CommandError(f"Fast path differs for ?fields={','.join(fields)}.")
+                self.stdout.write(f"fields={','.join(fields):<28} identical")
+            transaction.set_rollback(True)
+        self.stdout.write(self.style.SUCCESS("Fast path matches AppointmentSerializer."))
+
+    def vary(self, rng):
+        """Cover the nullable and free-text columns the seed leaves uniform."""
+        appointments = list(Appointment.objects.select_related("patient__user"))
+        for appointment in appointments:
+            appointment.reason = rng.choice([None, "", "Follow-up", 'Chest pain, "sharp" — 3 días\nsince Monday'])
+            appointment.meet_link = rng.choice([None, "https://meet.example.com/abc-defg-hij?pwd=x&y=1"])
+            if appointment.started_at is None and rng.random() < 0.3:
+                appointment.started_at = appointment.scheduled_time + timedelta(microseconds=rng.randrange(10**9))
+            if appointment.started_at is not None and rng.random() < 0.5:
+                appointment.completed_at = appointment.started_at + timedelta(minutes=rng.randrange(5, 60))
+        Appointment.objects.bulk_update(appointments, ["reason", "meet_link", "started_at", "completed_at"], batch_size=1000)
+        for appointment in appointments[:5]:
+            user = appointment.patient.user
+            user.first_name, user.last_name = "Zoë", "O'Brien-Łukasz 李"
+            user.save(update_fields=["first_name", "last_name"])
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.appointments.hll import STANDARD_ERROR, HyperLogLog
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure the HyperLogLog patient-sketch error against exact distinct "
+        "counts and fail if any estimate falls outside three standard errors "
+        f"(the expected standard error is {STANDARD_ERROR:.2%}). Also checks "
+        "that merging sketches matches sketching the union."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--cardinalities", type=int, nargs="+", default=[100, 1000, 10000, 100000])
+        parser.add_argument("--trials", type=int, default=20)
+
+    def handle(self, *args, **options):
+        bound = 3 * STANDARD_ERROR
+        failures = 0
+        for cardinality in options["cardinalities"]:
+            errors = []
+            for trial in range(options["trials"]):
+                offset = trial * 10_000_000
+                estimate = HyperLogLog().update(range(offset, offset + cardinality)).count()
+                errors.append((estimate - cardinality) / cardinality)
+            worst = max(errors, key=abs)
+            rms = (sum(e * e for e in errors) / len(errors)) ** 0.5
+            ok = abs(worst) <= bound
+            failures += not ok
+            self.stdout.write(
+                f"{'ok' if ok else 'FAIL':>4}  n={cardinality:<8} rms error={rms:.2%}  worst={worst:+.2%}"
+            )
+
+        halves = [HyperLogLog().update(range(0, 60000)), HyperLogLog().update(range(40000, 100000))]
+        if HyperLogLog.union(halves).count() != HyperLogLog().update(range(100000)).count():
+            raise CommandError("Merged sketches disagree with the sketch of the union.")
+        if failures:
+            raise CommandError(f"{failures} cardinalities exceeded the {bound:.2%} error bound.")
+        self.stdout.write(self.style.SUCCESS(f"All estimates within {bound:.2%}; merge matches union."))
@@ -0,0 +1,81 @@
+import re
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from apps.appointments.analytics import filter_appointments
+from apps.appointments.availability import conflicting_appointments
+from apps.appointments.directory import search_filter
+from apps.appointments.models import Appointment, DoctorSearchTerm
+from apps.appointments.sweeper import missed_appointments
+from apps.users.models import DoctorProfile
+
+from ._seed import seed_clinic
+
+# Subqueries name their tables U0, U1, ... in the plan.
+TABLES = "|".join([Appointment._meta.db_table, DoctorSearchTerm._meta.db_table, r"U\d+"])
+
+# A plan line that reads every row of the appointments or search term table.
+FULL_SCAN_PATTERNS = {
+    "sqlite": re.compile(rf"\bSCAN ({TABLES})\b(?! USING (COVERING )?INDEX)"),
+    "postgresql": re.compile(rf"\bSeq Scan on ({TABLES})\b"),
+}
+
+
+def hot_queries(doctor, patient):
+    """The appointment and directory queries on the request path, keyed by a short label."""
+    now = timezone.now()
+    today = timezone.localdate(now)
+    window = {"from": today - timedelta(days=30), "to": today}
+    return {
+        "booking conflict check": conflicting_appointments(doctor, now),
+        "missed sweep batch": missed_appointments(now).order_by("scheduled_time").values_list("id", flat=True)[:500],
+        "doctor listing": Appointment.objects.for_user(doctor.user).order_by("-scheduled_time", "-id")[:51],
+        "patient listing": Appointment.objects.for_user(patient.user).order_by("-scheduled_time", "-id")[:51],
+        "staff listing": Appointment.objects.order_by("-scheduled_time", "-id")[:51],
+        "hourly analytics window": filter_appointments(window),
+        "doctor load window": filter_appointments({**window, "doctor": doctor.pk}),
+        "directory search": DoctorProfile.objects.filter(search_filter(f"{doctor.user.first_name} {doctor.specialization[:4]}")),
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a throwaway clinic, EXPLAIN every hot appointment and directory query "
+        "and fail if any of them falls back to a full table scan."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--appointments", type=int, default=5000)
+        parser.add_argument("--doctors", type=int, default=20)
+        parser.add_argument("--patients", type=int, default=200)
+        parser.add_argument("--verbose-plans", action="store_true", help="Print every plan, not only failures.")
+
+    def handle(self, *args, **options):
+        pattern = FULL_SCAN_PATTERNS.get(connection.vendor)
+        if pattern is None:
+            raise CommandError(f"No full-scan detector for database vendor {connection.vendor!r}.")
+
+        failures = []
+        with transaction.atomic():
+            doctors, patients = seed_clinic(
+                doctors=options["doctors"],
+                patients=options["patients"],
+                appointments=options["appointments"],
+                prefix="plancheck",
+            )
+            for label, queryset in hot_queries(doctors[0], patients[0]).items():
+                plan = queryset.explain()
+                degraded = any(pattern.search(line) for line in plan.splitlines())
+                if degraded:
+                    failures.append(label)
+                if degraded or options["verbose_plans"]:
+                    self.stdout.write(f"--- {label}\n{plan}")
+                self.stdout.write(f"{'FULL SCAN' if degraded else 'ok':>9}  {label}")
+            transaction.set_rollback(True)
+
+        if failures:
+            raise CommandError(f"Full table scan in: {', '.join(failures)}")
+        self.stdout.write(self.style.SUCCESS("All hot queries use an index."))
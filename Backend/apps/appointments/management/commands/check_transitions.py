@@ -0,0 +1,114 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.appointments import views
+from apps.appointments.models import Appointment
+from apps.appointments.transitions import TRANSITIONS, apply_transition, status_change_allowed
+
+from ._seed import seed_clinic
+
+STATUSES = [status for status, _ in Appointment.STATUS_CHOICES]
+
+
+class Command(BaseCommand):
+    help = (
+        "Check every declared appointment transition from every status, the "
+        "409 returned when a transition loses a race, and the PATCH status "
+        "guard, against a throwaway clinic. Everything is rolled back."
+    )
+
+    def handle(self, *args, **options):
+        self.failures = []
+        with transaction.atomic():
+            (doctor,), (patient,) = seed_clinic(doctors=1, patients=1, appointments=0, prefix="transitions")
+            self.doctor, self.patient = doctor, patient
+            client = APIClient(HTTP_HOST="localhost")
+            client.force_authenticate(doctor.user)
+            # Dozens of requests from one user would trip the per-user throttle.
+            with mock.patch.object(views.AppointmentViewSet, "throttle_classes", []):
+                self.check_transitions()
+                self.check_lost_race(client)
+                self.check_patch_guard(client)
+            transaction.set_rollback(True)
+
+        for failure in self.failures:
+            self.stdout.write(f"FAIL  {failure}")
+        if self.failures:
+            raise CommandError(f"{len(self.failures)} transition checks failed.")
+        self.stdout.write(self.style.SUCCESS("All transition checks passed."))
+
+    def appointment(self, status):
+        return Appointment.objects.create(
+            doctor=self.doctor,
+            patient=self.patient,
+            scheduled_time=timezone.now() + timedelta(days=7),
+            status=status,
+        )
+
+    def expect(self, condition, message):
+        if not condition:
+            self.failures.append(message)
+
+    def check_transitions(self):
+        checked = 0
+        for name, transition in TRANSITIONS.items():
+            for status in STATUSES:
+                appointment = self.appointment(status)
+                updated = apply_transition(Appointment.objects.all(), appointment.pk, name)
+                appointment.refresh_from_db()
+                if status in transition.sources:
+                    self.expect(
+                        updated == 1 and appointment.status == transition.target,
+                        f"{name} from {status}: expected {transition.target}, got {appointment.status}",
+                    )
+                else:
+                    self.expect(
+                        updated == 0 and appointment.status == status,
+                        f"{name} from {status}: expected rejection, got {appointment.status}",
+                    )
+                checked += 1
+        self.stdout.write(f"{checked} transition/status pairs checked")
+
+    def check_lost_race(self, client):
+        """A transition that was allowed when the request arrived but lost to a concurrent one."""
+        appointment = self.appointment("confirmed")
+        real = views.apply_transition
+
+        def cancelled_first(queryset, pk, *args, **kwargs):
+            Appointment.objects.filter(pk=pk).update(status="cancelled")
+            return real(queryset, pk, *args, **kwargs)
+
+        with mock.patch.object(views, "apply_transition", cancelled_first):
+            response = client.post(f"/api/appointments/{appointment.pk}/complete_meet/")
+        appointment.refresh_from_db()
+        self.expect(response.status_code == 409, f"lost race: expected 409, got {response.status_code}")
+        self.expect(
+            appointment.status == "cancelled" and appointment.completed_at is None,
+            f"lost race: the concurrent cancel was overwritten ({appointment.status})",
+        )
+        self.stdout.write("lost-race 409 checked")
+
+    def check_patch_guard(self, client):
+        checked = 0
+        for current in STATUSES:
+            for new in STATUSES:
+                appointment = self.appointment(current)
+                response = client.patch(f"/api/appointments/{appointment.pk}/", {"status": new}, format="json")
+                appointment.refresh_from_db()
+                if status_change_allowed(current, new):
+                    self.expect(
+                        response.status_code == 200 and appointment.status == new,
+                        f"PATCH {current} -> {new}: expected 200, got {response.status_code}",
+                    )
+                else:
+                    self.expect(
+                        response.status_code == 400 and appointment.status == current,
+                        f"PATCH {current} -> {new}: expected 400, got {response.status_code}",
+                    )
+                checked += 1
+        self.stdout.write(f"{checked} PATCH status changes checked")
@@ -0,0 +1,86 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.appointments.models import Prescription
+from apps.appointments.storage import GC_SUFFIX, is_blob
+
+
+def walk(storage, path):
+    directories, files = storage.listdir(path)
+    for name in files:
+        yield os.path.join(path, name) if path else name
+    for directory in directories:
+        yield from walk(storage, os.path.join(path, directory) if path else directory)
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete content-addressed prescription blobs that no prescription "
+        "references, plus abandoned upload temp files. Files younger than the "
+        "grace period are kept so in-flight uploads are never collected."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--grace-hours", type=float, default=24)
+        parser.add_argument("--dry-run", action="store_true")
+
+    def handle(self, *args, **options):
+        field = Prescription._meta.get_field("file")
+        storage = field.storage
+        cutoff = time.time() - options["grace_hours"] * 3600
+        referenced = set(Prescription.objects.exclude(file="").values_list("file", flat=True).iterator())
+
+        candidates = []
+        if storage.exists(field.upload_to):
+            for name in walk(storage, field.upload_to.rstrip("/")):
+                if is_blob(name):
+                    candidates.append(name)
+                elif name.endswith(GC_SUFFIX) and is_blob(name[:-len(GC_SUFFIX)]) and not options["dry_run"]:
+                    # Left behind by an interrupted run: put it back and decide again next time.
+                    self.restore(storage, name[:-len(GC_SUFFIX)])
+        if storage.exists(""):
+            candidates += [name for name in storage.listdir("")[1] if name.startswith(".upload-")]
+
+        removed = freed = 0
+        for name in candidates:
+            if name in referenced:
+                continue
+            path = storage.path(name)
+            stat = os.stat(path)
+            if stat.st_mtime > cutoff:
+                continue
+            if not options["dry_run"] and not self.collect(storage, name, cutoff):
+                continue
+            removed += 1
+            freed += stat.st_size
+            self.stdout.write(f"{'would remove' if options['dry_run'] else 'removed'} {name}")
+
+        verb = "Would remove" if options["dry_run"] else "Removed"
+        self.stdout.write(self.style.SUCCESS(f"{verb} {removed} unreferenced blobs ({freed} bytes)."))
+
+    def collect(self, storage, name, cutoff):
+        """
+        Move ``name`` aside, re-check it and remove it. Returns whether it was removed.
+
+        ``referenced`` may be stale by now: a new upload can have deduplicated
+        onto this blob, refreshing its mtime, and saved its prescription. Once
+        the blob is renamed, such an upload no longer finds it and writes a
+        fresh copy, so an mtime checked after the rename is final.
+        """
+        path = storage.path(name)
+        try:
+            os.rename(path, path + GC_SUFFIX)
+        except FileNotFoundError:
+            return False
+        if os.stat(path + GC_SUFFIX).st_mtime > cutoff or Prescription.objects.filter(file=name).exists():
+            self.restore(storage, name)
+            return False
+        storage.purge(name + GC_SUFFIX)
+        return True
+
+    def restore(self, storage, name):
+        # A save may have written the blob again meanwhile; the content is identical.
+        path = storage.path(name)
+        os.replace(path + GC_SUFFIX, path)
@@ -0,0 +1,45 @@
+from django.core.files import File
+from django.core.management.base import BaseCommand
+
+from apps.appointments.models import Prescription
+from apps.appointments.storage import is_blob
+
+
+class Command(BaseCommand):
+    help = (
+        "Move prescription files stored under their upload names into the "
+        "content-addressed layout, deduplicating identical files. The old "
+        "file is removed once its row points at the blob."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true")
+        parser.add_argument("--keep-originals", action="store_true")
+
+    def handle(self, *args, **options):
+        storage = Prescription._meta.get_field("file").storage
+        moved = missing = 0
+        legacy = Prescription.objects.exclude(file="").only("id", "file").order_by("id")
+        for pres in legacy.iterator():
+            old_name = pres.file.name
+            if is_blob(old_name):
+                continue
+            if not storage.exists(old_name):
+                missing += 1
+                self.stderr.write(f"prescription {pres.pk}: {old_name} is missing")
+                continue
+            if options["dry_run"]:
+                self.stdout.write(f"would move {old_name}")
+                moved += 1
+                continue
+
+            with storage.open(old_name, "rb") as handle:
+                new_name = storage.save(old_name, File(handle))
+            Prescription.objects.filter(pk=pres.pk, file=old_name).update(file=new_name)
+            if not options["keep_originals"] and not Prescription.objects.filter(file=old_name).exists():
+                storage.purge(old_name)
+            moved += 1
+            self.stdout.write(f"{old_name} -> {new_name}")
+
+        verb = "Would move" if options["dry_run"] else "Moved"
+        self.stdout.write(self.style.SUCCESS(f"{verb} {moved} files ({missing} missing)."))
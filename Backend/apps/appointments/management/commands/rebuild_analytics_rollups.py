@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from apps.appointments import rollups
+
+
+class Command(BaseCommand):
+    help = "Recompute the analytics rollup tables from the appointments table."
+
+    def handle(self, *args, **options):
+        pairs = rollups.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt analytics rollups ({pairs} doctor/patient pairs)."))
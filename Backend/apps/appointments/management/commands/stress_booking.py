@@ -0,0 +1,101 @@
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection
+from django.utils import timezone
+from rest_framework import serializers
+
+from apps.appointments.availability import BLOCKING_STATUSES, BOOKING_BUFFER
+from apps.appointments.models import Appointment
+from apps.appointments.serializers import AppointmentSerializer
+from apps.users.models import User
+
+from ._seed import seed_clinic
+
+PREFIX = "stress"
+
+
+class Command(BaseCommand):
+    help = (
+        "Fire concurrent bookings from many threads at a few doctors, verify "
+        "that no two blocking appointments overlap and report bookings/second. "
+        "Creates its own doctors and patients and deletes them afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--bookings", type=int, default=500)
+        parser.add_argument("--threads", type=int, default=32)
+        parser.add_argument("--doctors", type=int, default=4)
+        parser.add_argument(
+            "--span-hours",
+            type=int,
+            default=12,
+            help="Requested times fall in this many hours, so most requests contend for the same slots.",
+        )
+
+    def handle(self, *args, **options):
+        if User.objects.filter(username__startswith=f"{PREFIX}-").exists():
+            raise CommandError(f"Users prefixed {PREFIX!r} already exist; remove them first.")
+
+        doctors, patients = seed_clinic(
+            doctors=options["doctors"], patients=options["threads"], appointments=0, prefix=PREFIX
+        )
+        try:
+            self.run(doctors, patients, options)
+        finally:
+            User.objects.filter(username__startswith=f"{PREFIX}-").delete()
+
+    def run(self, doctors, patients, options):
+        rng = random.Random(7)
+        base = (timezone.now() + timedelta(days=1)).replace(minute=0, second=0, microsecond=0)
+        requests = [
+            (
+                rng.choice(doctors).pk,
+                rng.choice(patients),
+                base + timedelta(minutes=5 * rng.randrange(options["span_hours"] * 12)),
+            )
+            for _ in range(options["bookings"])
+        ]
+
+        def book(item):
+            doctor_id, patient, scheduled_time = item
+            try:
+                serializer = AppointmentSerializer(
+                    data={"doctor_id": doctor_id, "scheduled_time": scheduled_time.isoformat()}
+                )
+                serializer.is_valid(raise_exception=True)
+                serializer.save(patient=patient)
+                return "booked"
+            except serializers.ValidationError:
+                return "conflict"
+            except OperationalError:
+                return "error"
+            finally:
+                connection.close()
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options["threads"]) as pool:
+            outcomes = list(pool.map(book, requests))
+        elapsed = time.perf_counter() - started
+
+        overlaps = 0
+        for doctor in doctors:
+            times = list(
+                Appointment.objects.filter(doctor=doctor, status__in=BLOCKING_STATUSES)
+                .order_by("scheduled_time")
+                .values_list("scheduled_time", flat=True)
+            )
+            overlaps += sum(1 for a, b in zip(times, times[1:]) if b - a <= BOOKING_BUFFER)
+
+        booked = outcomes.count("booked")
+        self.stdout.write(
+            f"requests={len(outcomes)} booked={booked} conflicts={outcomes.count('conflict')} "
+            f"errors={outcomes.count('error')} overlaps={overlaps} "
+            f"elapsed={elapsed:.2f}s throughput={len(outcomes) / elapsed:.0f} req/s ({booked / elapsed:.0f} bookings/s)"
+        )
+        if overlaps:
+            raise CommandError(f"{overlaps} overlapping bookings detected.")
+        self.stdout.write(self.style.SUCCESS("No overlapping bookings."))
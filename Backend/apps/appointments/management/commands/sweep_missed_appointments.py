@@ -0,0 +1,37 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.appointments.sweeper import sweep_missed_appointments
+
+
+class Command(BaseCommand):
+    help = "Mark confirmed appointments that were never started as missed."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep running and sweep every --interval seconds.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=int,
+            default=getattr(settings, "MISSED_SWEEP_INTERVAL_SECONDS", 60),
+            help="Seconds between sweeps when running with --loop.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=getattr(settings, "MISSED_SWEEP_BATCH_SIZE", 500),
+            help="Maximum rows updated per batch.",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            swept = sweep_missed_appointments(batch_size=options["batch_size"])
+            self.stdout.write(f"swept={swept}")
+            if not options["loop"]:
+                return
+            time.sleep(options["interval"])
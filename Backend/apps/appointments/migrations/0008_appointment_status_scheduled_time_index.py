@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0007_alter_appointment_status'),
+        ('users', '0003_doctorprofile_profile_picture_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['status', 'scheduled_time'], name='appointment_status_db2f9b_idx'),
+        ),
+    ]
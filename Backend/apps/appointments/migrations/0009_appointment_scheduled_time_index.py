@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0008_appointment_status_scheduled_time_index'),
+        ('users', '0003_doctorprofile_profile_picture_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['scheduled_time'], name='appointment_schedul_1965d6_idx'),
+        ),
+    ]
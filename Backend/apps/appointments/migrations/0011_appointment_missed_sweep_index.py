@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0010_appointment_user_scope_indexes'),
+        ('users', '0003_doctorprofile_profile_picture_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['status', 'started_at', 'scheduled_time'], name='appointment_status_d14f9e_idx'),
+        ),
+    ]
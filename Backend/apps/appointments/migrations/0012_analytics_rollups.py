@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:28
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0011_appointment_missed_sweep_index'),
+        ('users', '0004_doctorprofile_specialization_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DoctorRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('patient_count', models.PositiveIntegerField(default=0)),
+                ('doctor', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='rollup', to='users.doctorprofile')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='DailyAppointmentRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('status', models.CharField(choices=[('requested', 'Requested'), ('confirmed', 'Confirmed'), ('completed', 'Completed'), ('cancelled', 'Cancelled'), ('pending', 'Pending'), ('missed', 'Missed')], max_length=20)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('doctor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_rollups', to='users.doctorprofile')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('day', 'doctor', 'status'), name='unique_daily_appointment_rollup')],
+            },
+        ),
+        migrations.CreateModel(
+            name='DoctorPatientRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('appointment_count', models.PositiveIntegerField(default=0)),
+                ('doctor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='patient_rollups', to='users.doctorprofile')),
+                ('patient', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='doctor_rollups', to='users.patientprofile')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('doctor', 'patient'), name='unique_doctor_patient_rollup')],
+            },
+        ),
+    ]
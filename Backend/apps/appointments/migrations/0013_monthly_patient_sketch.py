@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:34
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0012_analytics_rollups'),
+        ('users', '0004_doctorprofile_specialization_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MonthlyPatientSketch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(help_text='First day of the month.')),
+                ('registers', models.BinaryField()),
+                ('doctor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='patient_sketches', to='users.doctorprofile')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('doctor', 'month'), name='unique_monthly_patient_sketch')],
+            },
+        ),
+    ]
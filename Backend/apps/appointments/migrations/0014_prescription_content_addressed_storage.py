@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:39
+
+import apps.appointments.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0013_monthly_patient_sketch'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='prescription',
+            name='file',
+            field=models.FileField(storage=apps.appointments.storage.prescription_storage, upload_to='prescriptions/'),
+        ),
+    ]
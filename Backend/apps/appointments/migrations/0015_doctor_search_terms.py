@@ -0,0 +1,50 @@
+# Generated by Django 5.2.18 on 2026-10-18 21:03
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def search_terms(username, first_name, last_name, specialization):
+    # Frozen copy of apps.appointments.directory.search_terms as of this migration.
+    terms = {username.lower(), first_name.lower(), last_name.lower(), *specialization.lower().split()}
+    terms.discard("")
+    return terms
+
+
+def index_existing_doctors(apps, schema_editor):
+    DoctorProfile = apps.get_model('users', 'DoctorProfile')
+    DoctorSearchTerm = apps.get_model('appointments', 'DoctorSearchTerm')
+    rows = DoctorProfile.objects.values_list(
+        'id', 'user__username', 'user__first_name', 'user__last_name', 'specialization'
+    )
+    DoctorSearchTerm.objects.bulk_create(
+        [
+            DoctorSearchTerm(doctor_id=doctor_id, term=term)
+            for doctor_id, *fields in rows.iterator()
+            for term in search_terms(*fields)
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0014_prescription_content_addressed_storage'),
+        ('users', '0004_doctorprofile_specialization_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DoctorSearchTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=150)),
+                ('doctor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_terms', to='users.doctorprofile')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['term', 'doctor'], name='appointment_term_8c55be_idx')],
+            },
+        ),
+        migrations.RunPython(index_existing_doctors, migrations.RunPython.noop),
+    ]
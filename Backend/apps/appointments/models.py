@@ -1,5 +1,38 @@
+import os
+
 from django.db import models
 from apps.users.models import DoctorProfile, PatientProfile
+from .storage import prescription_storage
+
+
+class AppointmentQuerySet(models.QuerySet):
+    def for_user(self, user):
+        """Appointments visible to ``user``: staff see all, doctors and patients their own."""
+        if user.is_staff or user.is_superuser:
+            return self
+        scope = models.Q()
+        if getattr(user, 'is_doctor', False):
+            scope |= models.Q(doctor__user=user)
+        if getattr(user, 'is_patient', False):
+            scope |= models.Q(patient__user=user)
+        if not scope:
+            return self.none()
+        return self.filter(scope)
+
+
+class PrescriptionQuerySet(models.QuerySet):
+    def for_user(self, user):
+        """Prescriptions visible to ``user``: staff see all, doctors and patients their own."""
+        if user.is_staff or user.is_superuser:
+            return self
+        scope = models.Q()
+        if getattr(user, 'is_doctor', False):
+            scope |= models.Q(appointment__doctor__user=user) | models.Q(uploaded_by__user=user)
+        if getattr(user, 'is_patient', False):
+            scope |= models.Q(appointment__patient__user=user)
+        if not scope:
+            return self.none()
+        return self.filter(scope)
 
 
 class Appointment(models.Model):
@@ -21,8 +54,20 @@ class Appointment(models.Model):
     started_at = models.DateTimeField(blank=True, null=True)
     completed_at = models.DateTimeField(blank=True, null=True)
 
+    objects = AppointmentQuerySet.as_manager()
+
     class Meta:
         ordering = ['-scheduled_time']
+        indexes = [
+            models.Index(fields=['status', 'scheduled_time']),
+            models.Index(fields=['scheduled_time']),
+            # Per-doctor listing and the double-booking range check.
+            models.Index(fields=['doctor', 'scheduled_time']),
+            models.Index(fields=['patient', 'scheduled_time']),
+            # Missed sweep: confirmed + never started + time range.
+            models.Index(fields=['status', 'started_at', 'scheduled_time']),
+        ]
+
     def __str__(self):
         return f"Appointment: {self.patient} with {self.doctor} at {self.scheduled_time}"
 
@@ -30,6 +75,67 @@ class Appointment(models.Model):
 class Prescription(models.Model):
     appointment = models.OneToOneField(Appointment, on_delete=models.CASCADE, related_name='prescription')
     uploaded_by = models.ForeignKey(DoctorProfile, on_delete=models.SET_NULL, null=True)
-    file = models.FileField(upload_to='prescriptions/')
+    file = models.FileField(upload_to='prescriptions/', storage=prescription_storage)
     notes = models.TextField(blank=True)
-    created_at = models.DateTimeField(auto_now_add=True)
\ No newline at end of file
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = PrescriptionQuerySet.as_manager()
+
+    @property
+    def download_filename(self):
+        """Stored names are content hashes, so downloads get a readable one."""
+        return f"prescription-{self.pk}{os.path.splitext(self.file.name)[1]}"
+
+
+class DailyAppointmentRollup(models.Model):
+    """Appointments per day, doctor and status, maintained by ``apps.appointments.rollups``."""
+    day = models.DateField()
+    doctor = models.ForeignKey(DoctorProfile, on_delete=models.CASCADE, related_name='daily_rollups')
+    status = models.CharField(max_length=20, choices=Appointment.STATUS_CHOICES)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'doctor', 'status'], name='unique_daily_appointment_rollup'),
+        ]
+
+
+class DoctorPatientRollup(models.Model):
+    """Appointments per doctor and patient; one row per pair that has any."""
+    doctor = models.ForeignKey(DoctorProfile, on_delete=models.CASCADE, related_name='patient_rollups')
+    patient = models.ForeignKey(PatientProfile, on_delete=models.CASCADE, related_name='doctor_rollups')
+    appointment_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['doctor', 'patient'], name='unique_doctor_patient_rollup'),
+        ]
+
+
+class DoctorRollup(models.Model):
+    """Distinct patients per doctor."""
+    doctor = models.OneToOneField(DoctorProfile, on_delete=models.CASCADE, related_name='rollup')
+    patient_count = models.PositiveIntegerField(default=0)
+
+
+class MonthlyPatientSketch(models.Model):
+    """HyperLogLog sketch of the patients booked with a doctor in one month (see ``apps.appointments.hll``)."""
+    doctor = models.ForeignKey(DoctorProfile, on_delete=models.CASCADE, related_name='patient_sketches')
+    month = models.DateField(help_text="First day of the month.")
+    registers = models.BinaryField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['doctor', 'month'], name='unique_monthly_patient_sketch'),
+        ]
+
+
+class DoctorSearchTerm(models.Model):
+    """Lowercased names and specialization words of a doctor, maintained by ``apps.appointments.directory``."""
+    doctor = models.ForeignKey(DoctorProfile, on_delete=models.CASCADE, related_name='search_terms')
+    term = models.CharField(max_length=150)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['term', 'doctor']),
+        ]
@@ -0,0 +1,126 @@
+from base64 import b64decode, b64encode
+from collections import OrderedDict
+from urllib import parse
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class AppointmentCursorPagination(BasePagination):
+    """
+    Keyset pagination over ``(scheduled_time, id)``, newest first.
+
+    Each page is a single indexed range query of ``page_size + 1`` rows
+    positioned by the last row of the previous page, so deep pages cost the
+    same as the first one and no ``COUNT(*)`` is ever issued. Cursors encode
+    the boundary row itself (not an offset), so they stay valid while new
+    appointments are booked.
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def get_page_size(self, request):
+        default = getattr(settings, 'APPOINTMENTS_PAGE_SIZE', 50)
+        maximum = getattr(settings, 'APPOINTMENTS_MAX_PAGE_SIZE', 200)
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, default))
+        except (TypeError, ValueError):
+            return default
+        return max(1, min(size, maximum))
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        position, reverse = self.decode_cursor(request)
+
+        if reverse:
+            queryset = queryset.order_by('scheduled_time', 'id')
+        else:
+            queryset = queryset.order_by('-scheduled_time', '-id')
+
+        if position is not None:
+            scheduled_time, pk = position
+            if reverse:
+                queryset = queryset.filter(
+                    Q(scheduled_time__gt=scheduled_time)
+                    | Q(scheduled_time=scheduled_time, id__gt=pk)
+                )
+            else:
+                queryset = queryset.filter(
+                    Q(scheduled_time__lt=scheduled_time)
+                    | Q(scheduled_time=scheduled_time, id__lt=pk)
+                )
+
+        rows = list(queryset[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+
+        self.has_next = (has_more if not reverse else position is not None) and bool(rows)
+        self.has_previous = (position is not None if not reverse else has_more) and bool(rows)
+        self.page = rows
+        return rows
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def position_of(self, row):
+        if isinstance(row, dict):
+            return row['scheduled_time'], row['id']
+        return row.scheduled_time, row.pk
+
+    def encode_cursor(self, row, reverse):
+        scheduled_time, pk = self.position_of(row)
+        tokens = {'t': scheduled_time.isoformat(), 'i': pk}
+        if reverse:
+            tokens['r'] = 1
+        encoded = b64encode(parse.urlencode(tokens, doseq=True).encode('ascii')).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None, False
+        try:
+            tokens = parse.parse_qs(b64decode(encoded.encode('ascii')).decode('ascii'), keep_blank_values=True)
+            scheduled_time = parse_datetime(tokens['t'][0])
+            pk = int(tokens['i'][0])
+            reverse = bool(int(tokens.get('r', ['0'])[0]))
+        except (TypeError, ValueError, KeyError, IndexError):
+            raise NotFound(self.invalid_cursor_message)
+        if scheduled_time is None:
+            raise NotFound(self.invalid_cursor_message)
+        return (scheduled_time, pk), reverse
@@ -0,0 +1,26 @@
+from rest_framework.renderers import BaseRenderer
+
+from .exports import csv_chunks, flatten, ndjson_chunks
+
+
+class CSVRenderer(BaseRenderer):
+    """Renders a list of (possibly nested) dicts as CSV, one flattened dict per row."""
+    media_type = "text/csv"
+    format = "csv"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        rows = [flatten(row) for row in (data if isinstance(data, list) else [data])]
+        fields = list(dict.fromkeys(field for row in rows for field in row))
+        return "".join(csv_chunks(rows, fields)).encode(self.charset)
+
+
+class NDJSONRenderer(BaseRenderer):
+    """Renders a list as newline-delimited JSON, one item per line."""
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        rows = data if isinstance(data, list) else [data]
+        return "".join(ndjson_chunks(rows)).encode(self.charset)
@@ -0,0 +1,191 @@
+"""
+Incremental maintenance of the analytics rollup tables.
+
+Every write path reports the ``(doctor_id, patient_id, scheduled_time)`` of
+the appointments it touched (before and after the change) to ``touch()``.
+Once the surrounding transaction commits, the affected ``(doctor, day)``
+and ``(doctor, patient)`` buckets are recomputed from ``Appointment`` with
+small indexed queries. Recomputing a bucket instead of applying +1/-1
+deltas keeps the rollups correct for queryset ``update()``/``bulk_update``
+paths that never see the old status, and makes every refresh idempotent.
+A refresh holds ``doctor_schedule_lock`` on its doctors, so two refreshes
+of the same bucket run one after the other and the later one always
+counts the latest committed rows, also under READ COMMITTED.
+
+Monthly HyperLogLog patient sketches are the exception: a sketch cannot
+forget a patient, so touched states are only ever added. Cancelled, moved or
+deleted appointments therefore stay counted in their old month until
+``rebuild()`` recomputes the sketches.
+"""
+from collections import Counter, defaultdict
+from datetime import datetime, time, timedelta
+
+from django.db import transaction
+from django.db.models import Count
+from django.db.models.functions import TruncDate, TruncMonth
+from django.utils import timezone
+
+from apps.users.models import DoctorProfile
+
+from .availability import doctor_schedule_lock
+from .hll import HyperLogLog
+from .models import Appointment, DailyAppointmentRollup, DoctorPatientRollup, DoctorRollup, MonthlyPatientSketch
+
+
+def touch(states, sketch=True):
+    """
+    Refresh the buckets of ``states`` after the current transaction commits.
+
+    Pass ``sketch=False`` for deleted appointments: sketches only ever add,
+    and the doctor itself may be what is being deleted.
+    """
+    states = {state for state in states if state}
+    if states:
+        transaction.on_commit(lambda: refresh(states, sketch))
+
+
+def refresh(states, sketch=True):
+    days = {(doctor_id, timezone.localdate(scheduled_time)) for doctor_id, _, scheduled_time in states}
+    pairs = {(doctor_id, patient_id) for doctor_id, patient_id, _ in states}
+    with doctor_schedule_lock(*{doctor_id for doctor_id, _, _ in states}):
+        for doctor_id, day in days:
+            refresh_day(doctor_id, day)
+        for doctor_id, patient_id in pairs:
+            refresh_pair(doctor_id, patient_id)
+        for doctor_id in {doctor_id for doctor_id, _ in pairs}:
+            refresh_doctor(doctor_id)
+        if sketch:
+            add_to_sketches(states)
+
+
+def day_bounds(day):
+    start = timezone.make_aware(datetime.combine(day, time.min))
+    return start, start + timedelta(days=1)
+
+
+def refresh_day(doctor_id, day):
+    start, end = day_bounds(day)
+    counts = dict(
+        Appointment.objects.filter(doctor_id=doctor_id, scheduled_time__gte=start, scheduled_time__lt=end)
+        .order_by()
+        .values_list("status")
+        .annotate(n=Count("id"))
+    )
+    DailyAppointmentRollup.objects.filter(doctor_id=doctor_id, day=day).exclude(status__in=counts).delete()
+    DailyAppointmentRollup.objects.bulk_create(
+        [DailyAppointmentRollup(day=day, doctor_id=doctor_id, status=s, count=n) for s, n in counts.items()],
+        update_conflicts=True,
+        unique_fields=["day", "doctor", "status"],
+        update_fields=["count"],
+    )
+
+
+def refresh_pair(doctor_id, patient_id):
+    n = Appointment.objects.filter(doctor_id=doctor_id, patient_id=patient_id).count()
+    if not n:
+        DoctorPatientRollup.objects.filter(doctor_id=doctor_id, patient_id=patient_id).delete()
+        return
+    DoctorPatientRollup.objects.bulk_create(
+        [DoctorPatientRollup(doctor_id=doctor_id, patient_id=patient_id, appointment_count=n)],
+        update_conflicts=True,
+        unique_fields=["doctor", "patient"],
+        update_fields=["appointment_count"],
+    )
+
+
+def refresh_doctor(doctor_id):
+    n = DoctorPatientRollup.objects.filter(doctor_id=doctor_id).count()
+    if not n:
+        DoctorRollup.objects.filter(doctor_id=doctor_id).delete()
+        return
+    DoctorRollup.objects.bulk_create(
+        [DoctorRollup(doctor_id=doctor_id, patient_count=n)],
+        update_conflicts=True,
+        unique_fields=["doctor"],
+        update_fields=["patient_count"],
+    )
+
+
+def month_of(day):
+    return day.replace(day=1)
+
+
+def save_sketches(sketches):
+    MonthlyPatientSketch.objects.bulk_create(
+        [
+            MonthlyPatientSketch(doctor_id=doctor_id, month=month, registers=sketch.to_bytes())
+            for (doctor_id, month), sketch in sketches.items()
+        ],
+        update_conflicts=True,
+        unique_fields=["doctor", "month"],
+        update_fields=["registers"],
+        batch_size=500,
+    )
+
+
+def add_to_sketches(states):
+    # A doctor deleted before the commit cascades to their sketches too.
+    doctor_ids = {doctor_id for doctor_id, _, _ in states}
+    existing = set(DoctorProfile.objects.filter(pk__in=doctor_ids).values_list("pk", flat=True))
+    patients = defaultdict(set)
+    for doctor_id, patient_id, scheduled_time in states:
+        if doctor_id not in existing:
+            continue
+        patients[(doctor_id, month_of(timezone.localdate(scheduled_time)))].add(patient_id)
+    rows = MonthlyPatientSketch.objects.select_for_update().filter(
+        doctor_id__in={doctor_id for doctor_id, _ in patients},
+        month__in={month for _, month in patients},
+    )
+    sketches = {(row.doctor_id, row.month): HyperLogLog(row.registers) for row in rows}
+    save_sketches({
+        key: sketches.get(key, HyperLogLog()).update(patient_ids)
+        for key, patient_ids in patients.items()
+    })
+
+
+def rebuild():
+    """Recompute every rollup and sketch from scratch with four grouped queries."""
+    with transaction.atomic():
+        DailyAppointmentRollup.objects.all().delete()
+        DoctorPatientRollup.objects.all().delete()
+        DoctorRollup.objects.all().delete()
+        MonthlyPatientSketch.objects.all().delete()
+
+        daily = (
+            Appointment.objects.order_by()
+            .annotate(day=TruncDate("scheduled_time"))
+            .values_list("day", "doctor_id", "status")
+            .annotate(n=Count("id"))
+        )
+        DailyAppointmentRollup.objects.bulk_create(
+            (DailyAppointmentRollup(day=day, doctor_id=d, status=s, count=n) for day, d, s, n in daily.iterator()),
+            batch_size=1000,
+        )
+
+        patients_per_doctor = Counter()
+        pairs = []
+        for doctor_id, patient_id, n in (
+            Appointment.objects.order_by()
+            .values_list("doctor_id", "patient_id")
+            .annotate(n=Count("id"))
+            .iterator()
+        ):
+            pairs.append(DoctorPatientRollup(doctor_id=doctor_id, patient_id=patient_id, appointment_count=n))
+            patients_per_doctor[doctor_id] += 1
+        DoctorPatientRollup.objects.bulk_create(pairs, batch_size=1000)
+        DoctorRollup.objects.bulk_create(
+            [DoctorRollup(doctor_id=d, patient_count=n) for d, n in patients_per_doctor.items()],
+            batch_size=1000,
+        )
+
+        sketches = defaultdict(HyperLogLog)
+        for doctor_id, patient_id, month in (
+            Appointment.objects.order_by()
+            .annotate(month=TruncMonth("scheduled_time"))
+            .values_list("doctor_id", "patient_id", "month")
+            .distinct()
+            .iterator()
+        ):
+            sketches[(doctor_id, timezone.localdate(month))].add(patient_id)
+        save_sketches(sketches)
+    return len(pairs)
@@ -1,5 +1,8 @@
 from rest_framework import serializers
+from backend.fieldsets import SparseFieldsetMixin
 from .models import Appointment, Prescription
+from .transitions import status_change_allowed
+from .availability import conflicting_appointments, doctor_schedule_lock, MAX_WINDOW, MIN_SLOT_MINUTES, MAX_SLOT_MINUTES
 from apps.users.serializers import (
     DoctorProfileReadSerializer,
     DoctorProfileWriteSerializer,
@@ -29,7 +32,7 @@ class PatientSimpleSerializer(serializers.ModelSerializer):
         return{'id':obj.user.id,'username':obj.user.username,'first_name':obj.user.first_name,'last_name':obj.user.last_name}
         
 
-class AppointmentSerializer(serializers.ModelSerializer):
+class AppointmentSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     doctor = DoctorSimpleSerializer(read_only=True)
     patient = PatientSimpleSerializer(read_only=True)
     doctor_id = serializers.PrimaryKeyRelatedField(queryset=DoctorProfile.objects.all(), source='doctor', write_only=True)
@@ -43,6 +46,10 @@ class AppointmentSerializer(serializers.ModelSerializer):
 
     
     def validate(self, attrs):
+        if self.instance and 'status' in attrs and not status_change_allowed(self.instance.status, attrs['status']):
+            raise serializers.ValidationError(
+                {"status": f"Cannot change status from {self.instance.status} to {attrs['status']}."}
+            )
         if self.instance:
             allowed_fields = {"status", "meet_link"}
             if set(attrs.keys()).issubset(allowed_fields):
@@ -62,18 +69,12 @@ class AppointmentSerializer(serializers.ModelSerializer):
                 {"scheduled_time": "Scheduled time must be in the future."}
             )
 
-        buffer = timedelta(minutes=30)
-
         if doctor:
-            conflict_qs = Appointment.objects.filter(
-                doctor=doctor,
-                status__in=["requested", "confirmed"],
-                scheduled_time__gte=scheduled_time - buffer,
-                scheduled_time__lte=scheduled_time + buffer,
+            conflict_qs = conflicting_appointments(
+                doctor,
+                scheduled_time,
+                exclude_pk=self.instance.pk if self.instance else None,
             )
-            if self.instance:
-                conflict_qs = conflict_qs.exclude(pk=self.instance.pk)
-
             if conflict_qs.exists():
                 raise serializers.ValidationError(
                     {"scheduled_time": "Doctor is not available at the chosen time."}
@@ -81,6 +82,13 @@ class AppointmentSerializer(serializers.ModelSerializer):
 
         return attrs
 
+    def ensure_slot_free(self, doctor, scheduled_time, exclude_pk=None):
+        # Re-checked under doctor_schedule_lock: validate() runs unlocked.
+        if conflicting_appointments(doctor, scheduled_time, exclude_pk=exclude_pk).exists():
+            raise serializers.ValidationError(
+                {"scheduled_time": "Doctor is not available at the chosen time."}
+            )
+
 
 
     def create(self, validated_data):
@@ -91,13 +99,154 @@ class AppointmentSerializer(serializers.ModelSerializer):
                 validated_data['patient'] = request.user.patient_profile
             else:
                 raise serializers.ValidationError({"patient": "Patient not provided and cannot be inferred from request."})
-        return super().create(validated_data)
+        doctor = validated_data['doctor']
+        with doctor_schedule_lock(doctor.pk):
+            self.ensure_slot_free(doctor, validated_data['scheduled_time'])
+            return super().create(validated_data)
 
+    def update(self, instance, validated_data):
+        if 'scheduled_time' not in validated_data:
+            return super().update(instance, validated_data)
+        doctor = validated_data.get('doctor', instance.doctor)
+        with doctor_schedule_lock(doctor.pk):
+            self.ensure_slot_free(doctor, validated_data['scheduled_time'], exclude_pk=instance.pk)
+            return super().update(instance, validated_data)
 
-class PrescriptionSerializer(serializers.ModelSerializer):
+
+class PrescriptionSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     uploaded_by = DoctorSimpleSerializer(read_only=True)
     appointment = AppointmentSerializer(read_only=True)
     appointment_id = serializers.PrimaryKeyRelatedField(queryset=Appointment.objects.all(), source='appointment', write_only=True)
     class Meta:
         model = Prescription
-        fields = ['id','appointment','uploaded_by','file','notes','created_at']
\ No newline at end of file
+        fields = ['id','appointment','appointment_id','uploaded_by','file','notes','created_at']
+
+
+class PrescriptionListSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    """Compact list row: ids plus a short appointment summary instead of nested objects."""
+    appointment_id = serializers.IntegerField(read_only=True)
+    doctor_id = serializers.IntegerField(source='appointment.doctor_id', read_only=True)
+    patient_id = serializers.IntegerField(source='appointment.patient_id', read_only=True)
+    uploaded_by_id = serializers.IntegerField(read_only=True)
+    scheduled_time = serializers.DateTimeField(source='appointment.scheduled_time', read_only=True)
+    doctor_name = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Prescription
+        fields = ['id','appointment_id','doctor_id','patient_id','uploaded_by_id','scheduled_time','doctor_name','file','notes','created_at']
+        sparse_sources = {'doctor_name': ['appointment']}
+
+    def get_doctor_name(self, obj):
+        user = obj.appointment.doctor.user
+        return user.get_full_name() or user.username
+
+
+class AvailabilityQuerySerializer(serializers.Serializer):
+    to = serializers.DateTimeField(required=False)
+    slot = serializers.IntegerField(required=False, default=30, min_value=MIN_SLOT_MINUTES, max_value=MAX_SLOT_MINUTES)
+
+    def get_fields(self):
+        fields = super().get_fields()
+        # "from" is a keyword, so it cannot be declared as a class attribute.
+        fields['from'] = serializers.DateTimeField(required=False)
+        return fields
+
+    def validate(self, attrs):
+        start = attrs.get('from') or timezone.now()
+        end = attrs.get('to') or start + timedelta(days=7)
+        if end <= start:
+            raise serializers.ValidationError({"to": "Must be after 'from'."})
+        if end - start > MAX_WINDOW:
+            raise serializers.ValidationError({"to": f"Window cannot exceed {MAX_WINDOW.days} days."})
+        return {'start': start, 'end': end, 'slot': timedelta(minutes=attrs['slot'])}
+
+
+class EarliestSlotQuerySerializer(AvailabilityQuerySerializer):
+    specialization = serializers.CharField()
+    limit = serializers.IntegerField(required=False, default=5, min_value=1, max_value=50)
+
+    def validate(self, attrs):
+        window = super().validate(attrs)
+        window['specialization'] = attrs['specialization']
+        window['limit'] = attrs['limit']
+        return window
+
+
+class BulkOperationSerializer(serializers.Serializer):
+    """One item of a bulk appointment request; ids are checked in batch by the caller."""
+    op = serializers.ChoiceField(choices=['create', 'reschedule'])
+    id = serializers.IntegerField(required=False)
+    doctor_id = serializers.IntegerField(required=False)
+    patient_id = serializers.IntegerField(required=False)
+    scheduled_time = serializers.DateTimeField()
+    status = serializers.ChoiceField(choices=['requested', 'confirmed'], default='requested')
+    reason = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+
+    def validate(self, attrs):
+        required = ['doctor_id', 'patient_id'] if attrs['op'] == 'create' else ['id']
+        missing = {name: ["This field is required."] for name in required if name not in attrs}
+        if missing:
+            raise serializers.ValidationError(missing)
+        if attrs['scheduled_time'] <= timezone.now():
+            raise serializers.ValidationError(
+                {"scheduled_time": "Scheduled time must be in the future."}
+            )
+        return attrs
+
+
+class DirectoryQuerySerializer(serializers.Serializer):
+    q = serializers.CharField(required=False, default='', allow_blank=True, max_length=100)
+    specialization = serializers.CharField(required=False, default='', allow_blank=True)
+    page = serializers.IntegerField(required=False, default=1, min_value=1)
+    page_size = serializers.IntegerField(required=False, default=50, min_value=1, max_value=200)
+
+
+class AnalyticsRangeSerializer(serializers.Serializer):
+    """Day range and doctor filter shared by the analytics endpoints; ``from``/``to`` are inclusive."""
+    to = serializers.DateField(required=False)
+    doctor = serializers.IntegerField(required=False)
+
+    def get_fields(self):
+        fields = super().get_fields()
+        fields['from'] = serializers.DateField(required=False)
+        return fields
+
+    def validate(self, attrs):
+        start, end = attrs.get('from'), attrs.get('to')
+        if start and end and end < start:
+            raise serializers.ValidationError({"to": "Must not be before 'from'."})
+        return attrs
+
+
+class AnalyticsQuerySerializer(AnalyticsRangeSerializer):
+    bucket = serializers.ChoiceField(choices=['hour', 'day', 'week', 'month'], required=False, default='day')
+    status = serializers.ChoiceField(choices=Appointment.STATUS_CHOICES, required=False)
+
+    # Hour buckets and the load heatmap read raw appointments, so their
+    # window is bounded.
+    raw_window = timedelta(days=31)
+    raw_default = timedelta(days=30)
+
+    def validate(self, attrs):
+        attrs = super().validate(attrs)
+        if attrs['bucket'] == 'hour' or self.context.get('raw'):
+            end = attrs.get('to') or timezone.localdate()
+            start = attrs.get('from') or end - self.raw_default
+            if end - start > self.raw_window:
+                raise serializers.ValidationError({"to": f"Window cannot exceed {self.raw_window.days} days."})
+            attrs['from'], attrs['to'] = start, end
+        return attrs
+
+
+class PatientsPerDoctorQuerySerializer(AnalyticsRangeSerializer):
+    """A range switches to per-month sketches; ``exact`` counts distinct patients in SQL instead."""
+    exact = serializers.BooleanField(required=False, default=False)
+
+
+class AppointmentListQuerySerializer(serializers.Serializer):
+    # Not "format": DRF reserves that parameter for choosing the renderer.
+    shape = serializers.ChoiceField(choices=['nested', 'normalized'], required=False, default='nested')
+
+
+class AppointmentExportQuerySerializer(AnalyticsRangeSerializer):
+    status = serializers.ChoiceField(choices=Appointment.STATUS_CHOICES, required=False)
@@ -0,0 +1,54 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from apps.users.models import DoctorProfile, User
+from . import rollups
+from .directory import index_doctors, invalidate_directory
+from .models import Appointment
+
+
+@receiver(post_save, sender=DoctorProfile)
+@receiver(post_delete, sender=DoctorProfile)
+def doctor_profile_changed(sender, instance, **kwargs):
+    if kwargs['signal'] is post_save:
+        index_doctors([instance.pk])
+    invalidate_directory()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def doctor_user_changed(sender, instance, **kwargs):
+    if not getattr(instance, 'is_doctor', False):
+        return
+    # Logins only touch last_login, which the directory does not show.
+    update_fields = kwargs.get('update_fields')
+    if update_fields and set(update_fields) == {'last_login'}:
+        return
+    if kwargs['signal'] is post_save:
+        index_doctors(DoctorProfile.objects.filter(user=instance).values_list('pk', flat=True))
+    invalidate_directory()
+
+
+def rollup_state(appointment):
+    return appointment.doctor_id, appointment.patient_id, appointment.scheduled_time
+
+
+@receiver(pre_save, sender=Appointment)
+def remember_previous_state(sender, instance, **kwargs):
+    instance._rollup_previous = None
+    if instance.pk:
+        instance._rollup_previous = (
+            Appointment.objects.filter(pk=instance.pk)
+            .values_list('doctor_id', 'patient_id', 'scheduled_time')
+            .first()
+        )
+
+
+@receiver(post_save, sender=Appointment)
+def appointment_saved(sender, instance, **kwargs):
+    rollups.touch([getattr(instance, '_rollup_previous', None), rollup_state(instance)])
+
+
+@receiver(post_delete, sender=Appointment)
+def appointment_deleted(sender, instance, **kwargs):
+    rollups.touch([rollup_state(instance)], sketch=False)
@@ -0,0 +1,29 @@
+"""
+Short-lived signed download links for prescription files.
+
+A token carries the storage name, the download filename and an expiry
+timestamp, HMAC-signed with ``SECRET_KEY`` through ``django.core.signing``.
+Checking one needs neither the database nor a user lookup, so the
+authorization query runs once, when the link is minted.
+"""
+import time
+
+from django.conf import settings
+from django.core import signing
+
+SALT = "apps.appointments.signed-prescription-download"
+
+
+def make_token(name, filename, ttl=None):
+    """Return ``(token, expires_at)`` for ``name``; ``expires_at`` is a Unix timestamp."""
+    ttl = ttl or getattr(settings, "PRESCRIPTION_SIGNED_URL_SECONDS", 300)
+    expires_at = int(time.time()) + ttl
+    return signing.dumps({"n": name, "f": filename, "e": expires_at}, salt=SALT), expires_at
+
+
+def read_token(token):
+    """Return ``(name, filename)``; raises ``BadSignature`` or ``SignatureExpired``."""
+    payload = signing.loads(token, salt=SALT)
+    if payload["e"] < time.time():
+        raise signing.SignatureExpired("Download link expired.")
+    return payload["n"], payload["f"]
@@ -0,0 +1,91 @@
+"""
+Content-addressed storage for prescription files.
+
+Uploads are hashed while they stream to a temporary file and then moved to
+``<upload_to>/ab/cd/<sha256><ext>``. The two-level shard keeps directories
+small, and identical uploads resolve to the same blob, which is stored once
+and shared by reference. Because blobs may be shared, ``delete()`` never
+removes them. ``manage.py gc_prescription_blobs`` removes the ones no
+prescription references any more.
+
+The collector and deduplicating saves agree through renames. The collector
+first renames a blob to ``<name>.gc``, re-checks it, and then either
+removes it or renames it back. A save that deduplicates onto a blob
+refreshes its mtime, which the re-check sees. If the blob was already
+renamed away, the save writes a fresh copy instead.
+"""
+import hashlib
+import os
+import posixpath
+import re
+import tempfile
+
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+# Suffix of a blob the collector has moved aside; never a valid blob name.
+GC_SUFFIX = ".gc"
+
+BLOB_RE = re.compile(r"^(?P<prefix>.+/)?[0-9a-f]{2}/[0-9a-f]{2}/(?P<digest>[0-9a-f]{64})(?P<ext>\.[a-z0-9]{1,10})?$")
+
+
+def blob_name(prefix, digest, ext):
+    return posixpath.join(prefix, digest[:2], digest[2:4], f"{digest}{ext}")
+
+
+def is_blob(name):
+    return bool(BLOB_RE.match(name))
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    def get_available_name(self, name, max_length=None):
+        # The final name is chosen from the content in _save(); an existing
+        # blob with that name is the same file, never a collision.
+        return name
+
+    def _save(self, name, content):
+        prefix, filename = posixpath.split(name)
+        ext = os.path.splitext(filename)[1].lower()
+        if not re.fullmatch(r"\.[a-z0-9]{1,10}", ext):
+            ext = ""
+
+        os.makedirs(self.location, exist_ok=True)
+        digest = hashlib.sha256()
+        fd, temp_path = tempfile.mkstemp(prefix=".upload-", dir=self.location)
+        try:
+            with os.fdopen(fd, "wb") as temp:
+                if hasattr(content, "seek"):
+                    content.seek(0)
+                for chunk in content.chunks():
+                    digest.update(chunk)
+                    temp.write(chunk)
+            name = blob_name(prefix, digest.hexdigest(), ext)
+            path = self.path(name)
+            try:
+                # Restart the GC grace period: the blob is about to be referenced again.
+                os.utime(path)
+            except FileNotFoundError:
+                # New content, or a blob the collector has just moved aside.
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                if self.file_permissions_mode is not None:
+                    os.chmod(temp_path, self.file_permissions_mode)
+                os.replace(temp_path, path)
+            else:
+                os.remove(temp_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        return name
+
+    def delete(self, name):
+        """Blobs can be shared between prescriptions; see ``purge()``."""
+
+    def purge(self, name):
+        """Really remove ``name``; only for garbage collection and migrations."""
+        super().delete(name)
+
+
+def prescription_storage():
+    return ContentAddressedStorage()
@@ -0,0 +1,57 @@
+import logging
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Appointment
+from .transitions import TRANSITIONS, apply_transitions
+
+logger = logging.getLogger(__name__)
+
+
+def missed_appointments(now=None):
+    grace = timedelta(minutes=getattr(settings, "MISSED_APPOINTMENT_GRACE_MINUTES", 5))
+    now = now or timezone.now()
+    return Appointment.objects.filter(
+        status__in=TRANSITIONS["miss"].sources,
+        scheduled_time__lt=now - grace,
+        started_at__isnull=True,
+        meet_link__isnull=True,
+    )
+
+
+def sweep_missed_appointments(batch_size=None, now=None):
+    """
+    Mark confirmed appointments that were never started as missed.
+
+    Rows are updated in batches of ``batch_size`` primary keys so a large
+    backlog never holds the write lock for one long table-wide UPDATE.
+    Returns the number of rows swept.
+    """
+    batch_size = batch_size or getattr(settings, "MISSED_SWEEP_BATCH_SIZE", 500)
+    now = now or timezone.now()
+    started = time.monotonic()
+    swept = 0
+    batches = 0
+
+    while True:
+        with transaction.atomic():
+            batch = list(missed_appointments(now).order_by("scheduled_time").values_list("id", flat=True)[:batch_size])
+            if not batch:
+                break
+            # Re-apply the filter so rows started in the meantime are left alone.
+            swept += apply_transitions(missed_appointments(now), batch, "miss")
+        batches += 1
+        if len(batch) < batch_size:
+            break
+
+    logger.info(
+        "Swept %d missed appointments in %d batches (%.1f ms)",
+        swept,
+        batches,
+        (time.monotonic() - started) * 1000,
+    )
+    return swept
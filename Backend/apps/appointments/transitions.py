@@ -0,0 +1,61 @@
+from typing import NamedTuple
+
+from . import rollups
+from .models import Appointment
+
+
+class Transition(NamedTuple):
+    sources: tuple
+    target: str
+    # System transitions carry conditions of their own (see ``sweeper``) and
+    # cannot be requested through a PATCH of ``status``.
+    manual: bool = True
+
+
+# Every status change an appointment can go through, keyed by the action
+# that performs it. Views apply these as a single conditional UPDATE, so a
+# transition only succeeds if the row is still in one of ``sources``.
+TRANSITIONS = {
+    "confirm": Transition(("requested", "pending"), "confirmed"),
+    "cancel": Transition(("requested", "pending", "confirmed"), "cancelled"),
+    "start_meet": Transition(("requested", "pending", "confirmed", "missed"), "confirmed"),
+    "complete_meet": Transition(("confirmed",), "completed"),
+    "set_meet_link": Transition(("requested", "pending", "confirmed", "missed"), "confirmed"),
+    "reschedule": Transition(("requested", "pending", "confirmed", "missed", "cancelled"), "confirmed"),
+    "miss": Transition(("confirmed",), "missed", manual=False),
+}
+
+
+def status_change_allowed(current, new):
+    """Whether any declared manual transition moves an appointment from ``current`` to ``new``."""
+    return current == new or any(
+        t.manual and current in t.sources and t.target == new for t in TRANSITIONS.values()
+    )
+
+
+def apply_transition(queryset, pk, name, conditions=None, previous=None, **changes):
+    """
+    Run transition ``name`` on row ``pk`` of ``queryset`` as one UPDATE.
+
+    The UPDATE matches only while the row is in an allowed source status
+    (plus any extra ``conditions``) and writes only the status and
+    ``changes``. Returns the number of rows updated: 0 means the row is
+    missing, out of scope, or lost a race to another transition.
+
+    ``previous`` is the row's ``(doctor_id, patient_id, scheduled_time)``
+    before the change, for transitions that move the appointment; the
+    analytics rollups of both the old and new day are refreshed.
+    """
+    return apply_transitions(queryset, [pk], name, conditions, previous=[previous], **changes)
+
+
+def apply_transitions(queryset, pks, name, conditions=None, previous=(), **changes):
+    """``apply_transition`` for every row of ``pks`` in one UPDATE; returns the number updated."""
+    transition = TRANSITIONS[name]
+    updated = queryset.filter(pk__in=pks, status__in=transition.sources, **(conditions or {})).update(
+        status=transition.target, **changes
+    )
+    if updated:
+        current = Appointment.objects.filter(pk__in=pks).values_list("doctor_id", "patient_id", "scheduled_time")
+        rollups.touch([*previous, *current])
+    return updated
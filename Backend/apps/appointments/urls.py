@@ -1,18 +1,23 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import AppointmentViewSet, PrescriptionViewSet, AnalyticsPatientsPerDoctor, AppointmentsPerDayView, DoctorViewSet
+from .views import AppointmentViewSet, PrescriptionViewSet, AnalyticsPatientsPerDoctor, AppointmentsPerDayView, PrescriptionDownloadView, DoctorViewSet, DoctorLoadHeatmapView, CohortAnalyticsView, signed_prescription_download
 
 app_name = 'appointments'
 
 router = DefaultRouter()
-router.register(r'', AppointmentViewSet, basename='appointments')
-
+# Prefixed routes first: the empty-prefix appointment detail route would
+# otherwise capture "prescriptions/" and "doctors/" as a pk.
 router.register(r'prescriptions', PrescriptionViewSet, basename='prescriptions')
 router.register(r'doctors', DoctorViewSet, basename='doctors')
+router.register(r'', AppointmentViewSet, basename='appointments')
 
 urlpatterns = [
     path('doctors/', DoctorViewSet.as_view({'get': 'list'}), name='doctor-list'),
+    path('download_prescription/<int:pk>/', PrescriptionDownloadView.as_view(), name='download_prescription'),
+    path('files/<str:token>/', signed_prescription_download, name='signed_prescription_download'),
     path('', include(router.urls)),
     path('analytics/patients-per-doctor/', AnalyticsPatientsPerDoctor.as_view(), name='patients_per_doctor'),
     path('analytics/appointments-per-day/', AppointmentsPerDayView.as_view(), name='appointments_per_day'),
+    path('analytics/doctor-load/', DoctorLoadHeatmapView.as_view(), name='doctor_load'),
+    path('analytics/cohorts/', CohortAnalyticsView.as_view(), name='cohorts'),
 ]
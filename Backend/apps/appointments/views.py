@@ -1,19 +1,40 @@
-from django.http import FileResponse, Http404
-from django.db.models import Count
-from django.db.models.functions import TruncDate
+from django.core import signing
+from django.http import Http404, HttpResponse, HttpResponseForbidden
+from django.urls import reverse
+from django.views.decorators.http import require_safe
+from django.db.models import F
+from django.db.models.functions import Lower
 from django.utils import timezone
-from datetime import timedelta
+from datetime import datetime, timedelta, timezone as dt_timezone
 from django.utils.dateparse import parse_datetime
+from django.conf import settings
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, quote_etag
 
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
 
 from .models import Appointment, Prescription
-from .serializers import AppointmentSerializer, PrescriptionSerializer
-from apps.users.models import DoctorProfile, PatientProfile
+from .serializers import AppointmentSerializer, PrescriptionSerializer, PrescriptionListSerializer, AvailabilityQuerySerializer, EarliestSlotQuerySerializer, DirectoryQuerySerializer, AnalyticsQuerySerializer, AnalyticsRangeSerializer, PatientsPerDoctorQuerySerializer, AppointmentListQuerySerializer, AppointmentExportQuerySerializer
+from .availability import conflicting_appointments, doctor_schedule_lock, free_slots, earliest_free_slots
+from .pagination import AppointmentCursorPagination
+from .bulk import apply_bulk_operations
+from .transitions import apply_transition
+from .directory import DIRECTORY_COLUMNS, get_directory
+from .caching import cached
+from .analytics import appointments_per_bucket, doctor_cohorts, doctor_load, filter_appointments, patients_per_doctor
+from .exports import streaming_export
+from .downloads import serve_file
+from .signed_urls import make_token, read_token
+from .renderers import CSVRenderer, NDJSONRenderer
+from .fastpath import appointment_rows, appointment_values, normalized_appointment_rows
+from apps.users.models import DoctorProfile
+from backend.fieldsets import SparseFieldsetViewMixin, select_fields
 from .permissions import IsDoctor, IsPatient
 
 
@@ -22,30 +43,122 @@ class DoctorViewSet(viewsets.ReadOnlyModelViewSet):
     permission_classes = [permissions.AllowAny]
 
     def list(self, request, *args, **kwargs):
-        data = [
-            {
-                "id": d.id,
-                "username": d.user.username,
-                "first_name": d.user.first_name,
-                "last_name": d.user.last_name,
-                "specialization": d.specialization,
-            }
-            for d in self.queryset
-        ]
-        return Response(data)
-
-def mark_missed_appointments():
-    Appointment.objects.filter(
-        status="confirmed",
-        scheduled_time__lt=timezone.now() - timedelta(minutes=5),
-        started_at__isnull=True,
-        meet_link__isnull=True,
-    ).update(status="missed")
-
-
-class AppointmentViewSet(viewsets.ModelViewSet):
+        params = DirectoryQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        query = params.validated_data
+
+        entry = get_directory(**query, fields=select_fields(list(DIRECTORY_COLUMNS), request))
+        page, count = query["page"], entry["data"]["count"]
+        url = request.build_absolute_uri()
+        response = Response({
+            "count": count,
+            "next": replace_query_param(url, "page", page + 1) if page * query["page_size"] < count else None,
+            "previous": replace_query_param(url, "page", page - 1) if page > 1 else None,
+            "results": entry["data"]["results"],
+            "facets": entry["data"]["facets"],
+        })
+        # One validator per representation: the JSON and msgpack bodies differ.
+        etag = quote_etag(f"{entry['etag'][1:-1]}-{request.accepted_renderer.format}")
+        response["ETag"] = etag
+        response["Last-Modified"] = http_date(entry["last_modified"])
+        patch_cache_control(response, public=True, no_cache=True)
+        patch_vary_headers(response, ["Accept"])
+        return get_conditional_response(
+            request,
+            etag=etag,
+            last_modified=entry["last_modified"],
+            response=response,
+        ) or response
+
+    @action(detail=True, methods=['get'])
+    def availability(self, request, pk=None):
+        doctor = self.get_object()
+        params = AvailabilityQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        window = params.validated_data
+
+        slots = free_slots(doctor.pk, window['start'], window['end'], window['slot'])
+        return Response({
+            "doctor": doctor.pk,
+            "from": window['start'],
+            "to": window['end'],
+            "slot": int(window['slot'].total_seconds() // 60),
+            "slots": slots,
+        })
+
+    @action(detail=False, methods=['get'])
+    def earliest(self, request):
+        params = EarliestSlotQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        query = params.validated_data
+
+        # Matches the Lower('specialization') index; iexact compiles to LIKE on SQLite.
+        doctors = {
+            d.id: d
+            for d in self.get_queryset()
+            .alias(specialization_lower=Lower('specialization'))
+            .filter(specialization_lower=query['specialization'].strip().lower())
+        }
+        slots = earliest_free_slots(
+            sorted(doctors), query['start'], query['end'], query['slot'], query['limit']
+        )
+        return Response({
+            "specialization": query['specialization'],
+            "from": query['start'],
+            "to": query['end'],
+            "slot": int(query['slot'].total_seconds() // 60),
+            "results": [
+                {
+                    "time": slot_time,
+                    "doctor": {
+                        "id": doctor_id,
+                        "username": doctors[doctor_id].user.username,
+                        "first_name": doctors[doctor_id].user.first_name,
+                        "last_name": doctors[doctor_id].user.last_name,
+                        "specialization": doctors[doctor_id].specialization,
+                    },
+                }
+                for slot_time, doctor_id in slots
+            ],
+        })
+
+EXPORT_FIELDS = (
+    "id", "scheduled_time", "status", "doctor_id", "patient_id",
+    "reason", "created_at", "started_at", "completed_at",
+)
+EXPORT_RELATED = {
+    "doctor_username": F("doctor__user__username"),
+    "patient_username": F("patient__user__username"),
+}
+
+
+class AppointmentViewSet(SparseFieldsetViewMixin, viewsets.ModelViewSet):
     queryset = Appointment.objects.select_related('patient__user', 'doctor__user').all()
     serializer_class = AppointmentSerializer
+    pagination_class = AppointmentCursorPagination
+
+    def get_queryset(self):
+        return super().get_queryset().for_user(self.request.user)
+
+    def list(self, request, *args, **kwargs):
+        # Read-only fast path: same JSON as AppointmentSerializer, built from values() rows.
+        query = AppointmentListQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        fields = self.get_serializer().sparse_fieldset
+        rows = appointment_values(self.filter_queryset(self.get_queryset()), fields)
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            rows = page
+
+        if query.validated_data['shape'] == 'normalized':
+            results, side_tables = normalized_appointment_rows(rows, fields)
+        else:
+            results, side_tables = appointment_rows(rows, fields), {}
+        if page is None:
+            return Response({'results': results, **side_tables} if side_tables else results)
+        response = self.get_paginated_response(results)
+        response.data.update(side_tables)
+        return response
 
     def get_permissions(self):
         if self.action == 'upload_prescription':
@@ -88,46 +201,58 @@ class AppointmentViewSet(viewsets.ModelViewSet):
         return Response(PrescriptionSerializer(pres, context={'request': request}).data,
                         status=status.HTTP_201_CREATED)
     
+    def lookup_pk(self):
+        try:
+            return int(self.kwargs[self.lookup_field])
+        except ValueError:
+            raise Http404
+
+    def transition(self, name, conditions=None, **changes):
+        return apply_transition(self.get_queryset(), self.lookup_pk(), name, conditions, **changes)
+
+    def transition_conflict(self, name):
+        appointment = self.get_object()
+        return Response(
+            {"detail": f"Appointment is {appointment.status}; {name} is not allowed."},
+            status=status.HTTP_409_CONFLICT
+        )
+
     @action(detail=True, methods=['post'], permission_classes=[IsDoctor])
     def start_meet(self, request, pk=None):
-        appointment = self.get_object()
         now = timezone.now()
-        
-        start = appointment.scheduled_time
-        end = start + timedelta(minutes=30)
-        if not (start <= now <= end):
-            return Response(
-                {
-                    "detail": "Meeting can only be started during scheduled time window"
-                },
-                status=status.HTTP_400_BAD_REQUEST
-            )
-
-        appointment.started_at = timezone.now()
-        appointment.status = "confirmed"
-        appointment.save()
+        window = timedelta(minutes=30)
+        started = self.transition(
+            "start_meet",
+            conditions={
+                "scheduled_time__lte": now,
+                "scheduled_time__gte": now - window,
+                "started_at__isnull": True,
+            },
+            started_at=now,
+        )
+        if not started:
+            appointment = self.get_object()
+            start = appointment.scheduled_time
+            if not (start <= now <= start + window):
+                return Response(
+                    {
+                        "detail": "Meeting can only be started during scheduled time window"
+                    },
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            return self.transition_conflict("start_meet")
 
         return Response({"detail": "Meeting started"})
-    
+
     @action(detail=True, methods=['post'], permission_classes=[IsDoctor])
     def complete_meet(self, request, pk=None):
-        appointment = self.get_object()
-
-        appointment.completed_at = timezone.now()
-        appointment.status = "completed"
-        appointment.save()
+        if not self.transition("complete_meet", completed_at=timezone.now()):
+            return self.transition_conflict("complete_meet")
 
         return Response({"detail": "Meeting completed"})
+
     @action(detail=True, methods=['post'], permission_classes=[IsDoctor])
     def reschedule(self, request, pk=None):
-        appointment = self.get_object()
-
-        if appointment.completed_at:
-            return Response(
-                {"detail": "Only missed or pending appointments can be rescheduled."},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-
         new_time = request.data.get("scheduled_time")
         if not new_time:
             return Response(
@@ -140,25 +265,82 @@ class AppointmentViewSet(viewsets.ModelViewSet):
                 {"detail": "Invalid datetime format"},
                 status=status.HTTP_400_BAD_REQUEST
             )
-        appointment.scheduled_time = parsed_time
-        appointment.status = "confirmed"
-        appointment.started_at = None
-        appointment.completed_at = None
-        appointment.meet_link = None 
-        appointment.save()
+        if timezone.is_naive(parsed_time):
+            parsed_time = timezone.make_aware(parsed_time)
+
+        appointment_id = self.lookup_pk()
+        previous = (
+            self.get_queryset().filter(pk=appointment_id)
+            .values_list("doctor_id", "patient_id", "scheduled_time")
+            .first()
+        )
+        if previous is None:
+            raise Http404
+        doctor_id = previous[0]
+
+        with doctor_schedule_lock(doctor_id):
+            if conflicting_appointments(doctor_id, parsed_time, exclude_pk=appointment_id).exists():
+                return Response(
+                    {"detail": "Doctor is not available at the chosen time."},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            rescheduled = self.transition(
+                "reschedule",
+                conditions={"completed_at__isnull": True},
+                previous=previous,
+                scheduled_time=parsed_time,
+                started_at=None,
+                completed_at=None,
+                meet_link=None,
+            )
+        if not rescheduled:
+            return self.transition_conflict("reschedule")
 
         return Response(
             {"detail": "Appointment rescheduled successfully"},
             status=status.HTTP_200_OK
         )
+
+    @action(detail=False, methods=['get'], renderer_classes=[CSVRenderer, NDJSONRenderer])
+    def export(self, request):
+        query = AppointmentExportQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+
+        rows = (
+            filter_appointments(query.validated_data, Appointment.objects.for_user(request.user))
+            .order_by("scheduled_time", "id")
+            .values(*EXPORT_FIELDS, **EXPORT_RELATED)
+            .iterator(chunk_size=2000)
+        )
+        fields = [*EXPORT_FIELDS, *EXPORT_RELATED]
+        return streaming_export(rows, fields, request.accepted_renderer.format, "appointments")
+
+    @action(detail=False, methods=['post'], permission_classes=[permissions.IsAdminUser])
+    def bulk(self, request):
+        operations = request.data.get("operations")
+        if not isinstance(operations, list):
+            return Response(
+                {"detail": "operations must be a list"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        limit = getattr(settings, "APPOINTMENTS_BULK_MAX_OPERATIONS", 500)
+        if len(operations) > limit:
+            return Response(
+                {"detail": f"At most {limit} operations per request"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return Response({"results": apply_bulk_operations(operations)})
+
     @action(detail=True, methods=["post"], permission_classes=[IsDoctor])
     def set_meet_link(self, request, pk=None):
-        appointment = self.get_object()
-        appointment.meet_link = request.data.get("meet_link")
-        appointment.status = "confirmed"
-        appointment.started_at = None          
-        appointment.completed_at = None 
-        appointment.save()
+        saved = self.transition(
+            "set_meet_link",
+            meet_link=request.data.get("meet_link"),
+            started_at=None,
+            completed_at=None,
+        )
+        if not saved:
+            return self.transition_conflict("set_meet_link")
         return Response({"detail": "Meet link saved"})
 
     
@@ -167,16 +349,65 @@ class AppointmentViewSet(viewsets.ModelViewSet):
         return super().create(request, *args, **kwargs)
 
 
-    def list(self, request, *args, **kwargs):
-        mark_missed_appointments()   
-        return super().list(request, *args, **kwargs)
-
+class PrescriptionViewSet(SparseFieldsetViewMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    Lists return the compact PrescriptionListSerializer; ``?expand=appointment``
+    (and every other action) uses the nested PrescriptionSerializer.
 
-class PrescriptionViewSet(viewsets.ModelViewSet):
-    queryset = Prescription.objects.select_related('appointment__patient__user', 'uploaded_by__user').all()
+    Read-only: prescriptions are created by the appointment's doctor through
+    ``upload_prescription`` or a finalized ``/api/uploads/`` session.
+    """
+    queryset = Prescription.objects.all()
     serializer_class = PrescriptionSerializer
     permission_classes = [permissions.IsAuthenticated]
 
+    def is_compact(self):
+        expand = set(self.request.query_params.get('expand', '').split(','))
+        return self.action in ('list', 'mine') and 'appointment' not in expand
+
+    def get_serializer_class(self):
+        if self.is_compact():
+            return PrescriptionListSerializer
+        return PrescriptionSerializer
+
+    def get_queryset(self):
+        queryset = super().get_queryset().for_user(self.request.user).order_by('-created_at', '-id')
+        if self.is_compact():
+            return queryset.select_related('appointment__doctor__user')
+        return queryset.select_related(
+            'appointment__doctor__user', 'appointment__patient__user', 'uploaded_by__user'
+        )
+
+    @action(detail=False, methods=['get'], permission_classes=[permissions.IsAuthenticated, IsPatient])
+    def mine(self, request):
+        queryset = self.filter_queryset(self.get_queryset()).filter(appointment__patient__user=request.user)
+        return Response(self.get_serializer(queryset, many=True).data)
+
+    @action(detail=True, methods=['get'])
+    def download_url(self, request, pk=None):
+        pres = self.get_object()
+        if not pres.file:
+            raise Http404("File not available")
+        token, expires_at = make_token(pres.file.name, pres.download_filename)
+        url = reverse('appointments:signed_prescription_download', args=[token])
+        return Response({
+            "url": request.build_absolute_uri(url),
+            "expires_at": datetime.fromtimestamp(expires_at, tz=dt_timezone.utc),
+        })
+
+
+@require_safe
+def signed_prescription_download(request, token):
+    """Serve a prescription file from a signed link, without touching the database."""
+    try:
+        name, filename = read_token(token)
+    except signing.SignatureExpired:
+        return HttpResponse("Download link expired.", status=410)
+    except signing.BadSignature:
+        return HttpResponseForbidden("Invalid download link.")
+    storage = Prescription._meta.get_field('file').storage
+    return serve_file(request, storage, name, filename)
+
 
 class PrescriptionDownloadView(APIView):
     permission_classes = [IsAuthenticated]
@@ -206,25 +437,58 @@ class PrescriptionDownloadView(APIView):
         if not pres.file:
             raise Http404("File not available")
 
-        file_handle = pres.file.open('rb')
-        filename = pres.file.name.split('/')[-1]
-        response = FileResponse(file_handle, as_attachment=True, filename=filename)
-        return response
+        return serve_file(request, pres.file.storage, pres.file.name, pres.download_filename)
+
 
+def analytics_cache_key(name, params):
+    return f"analytics:{name}:" + ",".join(f"{k}={params[k]}" for k in sorted(params))
 
-class AnalyticsPatientsPerDoctor(APIView):
+
+class AnalyticsView(APIView):
+    """Admin-only aggregate, also available as ``?format=csv`` or ``?format=ndjson``."""
     permission_classes = [permissions.IsAdminUser]
+    renderer_classes = [*api_settings.DEFAULT_RENDERER_CLASSES, CSVRenderer, NDJSONRenderer]
+
 
+class AnalyticsPatientsPerDoctor(AnalyticsView):
     def get(self, request):
-        data = DoctorProfile.objects.annotate(
-            patient_count=Count('appointments__patient', distinct=True)
-        ).values('id', 'user__username', 'specialization', 'patient_count')
-        return Response(list(data))
+        query = PatientsPerDoctorQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        params = query.validated_data
 
+        ttl = getattr(settings, "ANALYTICS_CACHE_SECONDS", 60)
+        key = analytics_cache_key("patients-per-doctor", params)
+        return Response(cached(key, lambda: patients_per_doctor(params), ttl))
 
-class AppointmentsPerDayView(APIView):
-    permission_classes = [permissions.IsAdminUser]
 
+class AppointmentsPerDayView(AnalyticsView):
     def get(self, request):
-        qs = Appointment.objects.annotate(date=TruncDate('scheduled_time')).values('date').annotate(count=Count('id')).order_by('date')
-        return Response(list(qs))
+        query = AnalyticsQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        params = query.validated_data
+
+        ttl = getattr(settings, "ANALYTICS_CACHE_SECONDS", 60)
+        key = analytics_cache_key("appointments-per-bucket", params)
+        return Response(cached(key, lambda: appointments_per_bucket(params), ttl))
+
+
+class DoctorLoadHeatmapView(AnalyticsView):
+    def get(self, request):
+        query = AnalyticsQuerySerializer(data=request.query_params, context={"raw": True})
+        query.is_valid(raise_exception=True)
+        params = query.validated_data
+
+        ttl = getattr(settings, "ANALYTICS_CACHE_SECONDS", 60)
+        key = analytics_cache_key("doctor-load", params)
+        return Response(cached(key, lambda: doctor_load(params), ttl))
+
+
+class CohortAnalyticsView(AnalyticsView):
+    def get(self, request):
+        query = AnalyticsRangeSerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        params = query.validated_data
+
+        ttl = getattr(settings, "ANALYTICS_CACHE_SECONDS", 60)
+        key = analytics_cache_key("cohorts", params)
+        return Response(cached(key, lambda: doctor_cohorts(params), ttl))
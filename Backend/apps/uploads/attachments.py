@@ -0,0 +1,33 @@
+"""Hand a completed upload to the model it was uploaded for."""
+from django.core.files import File
+from django.db import IntegrityError, transaction
+from PIL import Image, UnidentifiedImageError
+from rest_framework import serializers
+
+from apps.appointments.models import Prescription
+
+
+def attach(session, handle):
+    """Create the prescription or set the profile picture from ``handle``; returns the owning object."""
+    if session.purpose == 'prescription':
+        try:
+            with transaction.atomic():
+                return Prescription.objects.create(
+                    appointment=session.appointment,
+                    uploaded_by=session.user.doctor_profile,
+                    file=File(handle, name=session.filename),
+                    notes=session.notes,
+                )
+        except IntegrityError:
+            raise serializers.ValidationError({"appointment_id": "This appointment already has a prescription."})
+
+    try:
+        Image.open(handle).verify()
+    except (UnidentifiedImageError, OSError):
+        raise serializers.ValidationError({"detail": "Uploaded file is not an image."})
+    handle.seek(0)
+
+    user = session.user
+    profile = getattr(user, 'doctor_profile', None) or getattr(user, 'patient_profile', None)
+    profile.profile_picture.save(session.filename, File(handle), save=True)
+    return profile
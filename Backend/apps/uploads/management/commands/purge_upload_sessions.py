@@ -0,0 +1,33 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from apps.uploads.models import UploadSession
+
+
+class Command(BaseCommand):
+    help = (
+        "Abort upload sessions idle for longer than UPLOAD_SESSION_TTL_HOURS, "
+        "delete their partial files and drop finished sessions older than --keep-days."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--keep-days", type=int, default=7)
+
+    def handle(self, *args, **options):
+        idle_since = timezone.now() - timedelta(hours=settings.UPLOAD_SESSION_TTL_HOURS)
+        expired = UploadSession.objects.filter(status=UploadSession.ACTIVE, updated_at__lt=idle_since)
+        aborted = 0
+        for session in expired.iterator():
+            session.discard_data()
+            aborted += UploadSession.objects.filter(pk=session.pk, status=UploadSession.ACTIVE).update(
+                status=UploadSession.ABORTED
+            )
+
+        finished_before = timezone.now() - timedelta(days=options["keep_days"])
+        deleted, _ = UploadSession.objects.exclude(status=UploadSession.ACTIVE).filter(
+            updated_at__lt=finished_before
+        ).delete()
+        self.stdout.write(self.style.SUCCESS(f"Aborted {aborted} idle uploads, deleted {deleted} old sessions."))
@@ -0,0 +1,65 @@
+import os
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+
+class UploadSessionQuerySet(models.QuerySet):
+    def active(self):
+        """Sessions still accepting chunks; idle ones past the TTL count as abandoned."""
+        idle_since = timezone.now() - timedelta(hours=settings.UPLOAD_SESSION_TTL_HOURS)
+        return self.filter(status=UploadSession.ACTIVE, updated_at__gte=idle_since)
+
+
+class UploadSession(models.Model):
+    """A resumable upload: chunks are appended to ``temp_path`` until ``offset == size``."""
+    ACTIVE = 'active'
+    COMPLETED = 'completed'
+    ABORTED = 'aborted'
+    STATUS_CHOICES = [
+        (ACTIVE, 'Active'),
+        (COMPLETED, 'Completed'),
+        (ABORTED, 'Aborted'),
+    ]
+    PURPOSE_CHOICES = [
+        ('prescription', 'Prescription'),
+        ('profile_picture', 'Profile picture'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='upload_sessions')
+    purpose = models.CharField(max_length=20, choices=PURPOSE_CHOICES)
+    appointment = models.ForeignKey(
+        'appointments.Appointment', on_delete=models.CASCADE, null=True, blank=True, related_name='upload_sessions'
+    )
+    notes = models.TextField(blank=True)
+    filename = models.CharField(max_length=255)
+    size = models.PositiveBigIntegerField()
+    checksum = models.CharField(max_length=64, help_text="Expected SHA-256 of the whole file, hex.")
+    offset = models.PositiveBigIntegerField(default=0)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=ACTIVE)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = UploadSessionQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'status']),
+        ]
+
+    @property
+    def temp_path(self):
+        return os.path.join(settings.UPLOAD_SESSION_DIR, f"{self.pk}.part")
+
+    def discard_data(self):
+        try:
+            os.remove(self.temp_path)
+        except FileNotFoundError:
+            pass
+
+    def __str__(self):
+        return f"Upload {self.pk} ({self.purpose}, {self.offset}/{self.size})"
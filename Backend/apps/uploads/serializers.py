@@ -0,0 +1,49 @@
+import re
+
+from django.conf import settings
+from rest_framework import serializers
+
+from apps.appointments.models import Appointment, Prescription
+from .models import UploadSession
+
+
+class UploadSessionSerializer(serializers.ModelSerializer):
+    appointment_id = serializers.PrimaryKeyRelatedField(
+        queryset=Appointment.objects.select_related('doctor__user'), source='appointment',
+        required=False, allow_null=True,
+    )
+
+    class Meta:
+        model = UploadSession
+        fields = [
+            'id', 'purpose', 'appointment_id', 'notes', 'filename', 'size', 'checksum',
+            'offset', 'status', 'created_at', 'updated_at',
+        ]
+        read_only_fields = ['offset', 'status', 'created_at', 'updated_at']
+
+    def validate_checksum(self, value):
+        value = value.lower()
+        if not re.fullmatch(r'[0-9a-f]{64}', value):
+            raise serializers.ValidationError("Must be a hex SHA-256 digest.")
+        return value
+
+    def validate(self, attrs):
+        user = self.context['request'].user
+        purpose = attrs['purpose']
+        limit = settings.UPLOAD_MAX_BYTES[purpose]
+        if not 0 < attrs['size'] <= limit:
+            raise serializers.ValidationError({"size": f"Must be between 1 and {limit} bytes."})
+
+        if purpose == 'prescription':
+            appointment = attrs.get('appointment')
+            if appointment is None:
+                raise serializers.ValidationError({"appointment_id": "Required for prescription uploads."})
+            if not user.is_doctor or appointment.doctor.user_id != user.pk:
+                raise serializers.ValidationError({"appointment_id": "Not one of your appointments."})
+            if Prescription.objects.filter(appointment=appointment).exists():
+                raise serializers.ValidationError({"appointment_id": "This appointment already has a prescription."})
+        else:
+            attrs['appointment'] = None
+            if not hasattr(user, 'doctor_profile') and not hasattr(user, 'patient_profile'):
+                raise serializers.ValidationError({"purpose": "You have no profile to attach a picture to."})
+        return attrs
@@ -0,0 +1,12 @@
+from django.urls import path, include
+from rest_framework.routers import DefaultRouter
+from .views import UploadSessionViewSet
+
+app_name = 'uploads'
+
+router = DefaultRouter()
+router.register(r'', UploadSessionViewSet, basename='uploads')
+
+urlpatterns = [
+    path('', include(router.urls)),
+]
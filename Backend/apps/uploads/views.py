@@ -0,0 +1,177 @@
+import hashlib
+import os
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DatabaseError, transaction
+from rest_framework import mixins, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import APIException, ValidationError
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from apps.appointments.serializers import PrescriptionSerializer
+from apps.users.models import User
+from apps.users.serializers import UserDetailSerializer
+from .attachments import attach
+from .models import UploadSession
+from .serializers import UploadSessionSerializer
+
+BLOCK_SIZE = 64 * 1024
+
+
+class UploadSessionViewSet(mixins.CreateModelMixin,
+                           mixins.RetrieveModelMixin,
+                           mixins.DestroyModelMixin,
+                           viewsets.GenericViewSet):
+    """
+    Resumable uploads: create a session, PUT the bytes in chunks, then finalize.
+
+    ``PUT chunk/`` takes the raw bytes as the request body and the position
+    in an ``Upload-Offset`` header (or ``?offset=``). A chunk is accepted
+    only when that offset equals the session's current offset, so a client
+    that lost a response asks ``GET``/``HEAD`` for the offset and resumes
+    from there. Finalizing checks the SHA-256 declared at creation before
+    the file is attached.
+    """
+    serializer_class = UploadSessionSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        return UploadSession.objects.filter(user=self.request.user)
+
+    def perform_create(self, serializer):
+        with transaction.atomic():
+            # Lock the user row so concurrent creates cannot both pass the limit.
+            User.objects.select_for_update().filter(pk=self.request.user.pk).first()
+            active = UploadSession.objects.filter(user=self.request.user).active().count()
+            if active >= settings.UPLOAD_MAX_ACTIVE_SESSIONS:
+                raise ValidationError({"detail": f"At most {settings.UPLOAD_MAX_ACTIVE_SESSIONS} uploads can be in progress."})
+            session = serializer.save(user=self.request.user)
+        os.makedirs(settings.UPLOAD_SESSION_DIR, exist_ok=True)
+        open(session.temp_path, 'wb').close()
+
+    def retrieve(self, request, *args, **kwargs):
+        session = self.get_object()
+        return offset_response(self.get_serializer(session).data, session.offset)
+
+    def perform_destroy(self, instance):
+        with self.session_lock(instance):
+            UploadSession.objects.filter(pk=instance.pk, status=UploadSession.ACTIVE).update(status=UploadSession.ABORTED)
+            instance.discard_data()
+
+    def active_session(self):
+        session = self.get_object()
+        if session.status != UploadSession.ACTIVE:
+            raise ValidationError({"detail": f"Upload is {session.status}."})
+        return session
+
+    @contextmanager
+    def session_lock(self, session):
+        """
+        Transaction holding a row lock on ``session``, so one chunk, finalize
+        or abort runs per session at a time. A request that finds the row
+        locked gets ``UploadBusy`` instead of waiting. On SQLite, where
+        ``select_for_update`` is a no-op, the ``IMMEDIATE`` transaction
+        mode serializes the requests instead.
+        """
+        with transaction.atomic():
+            try:
+                UploadSession.objects.select_for_update(nowait=True).filter(pk=session.pk).first()
+            except DatabaseError:
+                raise UploadBusy()
+            yield
+
+    @action(detail=True, methods=['put', 'patch'])
+    def chunk(self, request, pk=None):
+        session = self.active_session()
+        try:
+            offset = int(request.headers.get('Upload-Offset', request.query_params.get('offset', '')))
+            length = int(request.META.get('CONTENT_LENGTH') or 0)
+        except ValueError:
+            raise ValidationError({"detail": "Upload-Offset and Content-Length must be integers."})
+        if length <= 0:
+            raise ValidationError({"detail": "A non-empty body with Content-Length is required."})
+        if length > settings.UPLOAD_MAX_CHUNK_BYTES:
+            return Response(
+                {"detail": f"Chunks are limited to {settings.UPLOAD_MAX_CHUNK_BYTES} bytes."},
+                status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            )
+        if offset + length > session.size:
+            raise ValidationError({"detail": "Chunk runs past the declared upload size."})
+
+        with self.session_lock(session):
+            session.refresh_from_db(fields=['offset', 'status'])
+            if session.status != UploadSession.ACTIVE or offset != session.offset:
+                return offset_response(
+                    {"detail": "Offset does not match the upload.", "offset": session.offset},
+                    session.offset,
+                    status.HTTP_409_CONFLICT,
+                )
+            written = 0
+            with open(session.temp_path, 'r+b') as temp:
+                temp.seek(offset)
+                temp.truncate()
+                while written < length:
+                    block = request.stream.read(min(BLOCK_SIZE, length - written))
+                    if not block:
+                        break
+                    temp.write(block)
+                    written += len(block)
+            # Keep whatever arrived, so a dropped connection resumes mid-chunk.
+            session.offset = offset + written
+            session.save(update_fields=['offset', 'updated_at'])
+
+        if written < length:
+            return offset_response(
+                {"detail": "Chunk ended early.", "offset": session.offset},
+                session.offset,
+                status.HTTP_400_BAD_REQUEST,
+            )
+        return offset_response({"offset": session.offset, "size": session.size}, session.offset)
+
+    @action(detail=True, methods=['post'])
+    def finalize(self, request, pk=None):
+        session = self.active_session()
+        mismatch = False
+        with self.session_lock(session):
+            session.refresh_from_db(fields=['offset', 'status'])
+            if session.offset != session.size:
+                return offset_response(
+                    {"detail": "Upload is incomplete.", "offset": session.offset},
+                    session.offset,
+                    status.HTTP_409_CONFLICT,
+                )
+            with open(session.temp_path, 'rb') as temp:
+                digest = hashlib.sha256()
+                for block in iter(lambda: temp.read(BLOCK_SIZE), b''):
+                    digest.update(block)
+                mismatch = digest.hexdigest() != session.checksum
+                if not mismatch:
+                    temp.seek(0)
+                    session.user = request.user
+                    target = attach(session, temp)
+            # Raising inside the lock would roll back the ABORTED status.
+            session.status = UploadSession.ABORTED if mismatch else UploadSession.COMPLETED
+            session.save(update_fields=['status', 'updated_at'])
+            session.discard_data()
+        if mismatch:
+            raise ValidationError({"checksum": "Checksum mismatch; start a new upload."})
+
+        context = {'request': request}
+        if session.purpose == 'prescription':
+            return Response(PrescriptionSerializer(target, context=context).data, status=status.HTTP_201_CREATED)
+        return Response(UserDetailSerializer(request.user, context=context).data)
+
+
+def offset_response(data, offset, status_code=status.HTTP_200_OK):
+    response = Response(data, status=status_code)
+    response['Upload-Offset'] = str(offset)
+    return response
+
+
+class UploadBusy(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "Another request is writing to this upload; retry shortly."
+    default_code = "upload_busy"
+
@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models.functions import Lower
 from django.contrib.auth.models import AbstractUser
 
 
@@ -16,6 +17,12 @@ class DoctorProfile(models.Model):
     phone = models.CharField(max_length=20, blank=True)
     profile_picture = models.ImageField(upload_to="profiles/doctors/", null=True, blank=True)  
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['specialization']),
+            # Case-insensitive lookups (earliest free slot by specialization).
+            models.Index(Lower('specialization'), name='doctor_specialization_lower'),
+        ]
 
     def __str__(self):
         return f"Dr. {self.user.get_full_name() or self.user.username} - {self.specialization}"
@@ -2,6 +2,7 @@ from rest_framework import serializers
 from django.contrib.auth.password_validation import validate_password
 from .models import User, DoctorProfile, PatientProfile
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from backend.fieldsets import SparseFieldsetMixin
 
 class UserReadSerializer(serializers.ModelSerializer):
     class Meta:
@@ -121,7 +122,7 @@ class UserRegisterSerializer(serializers.ModelSerializer):
         return user
 
 
-class UserDetailSerializer(serializers.ModelSerializer):
+class UserDetailSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     doctor_profile = DoctorProfileReadSerializer(read_only=True)
     patient_profile = PatientProfileReadSerializer(read_only=True)
 
@@ -8,6 +8,7 @@ from rest_framework.views import APIView
 from .models import User, DoctorProfile, PatientProfile
 from .serializers import UserRegisterSerializer, UserDetailSerializer, UserUpdateSerializer, CustomTokenObtainPairSerializer
 from .permissions import IsSuperUser  
+from backend.fieldsets import SparseFieldsetViewMixin
 from django.http import JsonResponse
 from django.views.decorators.csrf import ensure_csrf_cookie
 from rest_framework.parsers import MultiPartParser, FormParser
@@ -19,8 +20,8 @@ from django.utils.decorators import method_decorator
 
 logger = logging.getLogger(__name__)
 
-class UserViewSet(viewsets.ModelViewSet):
-    queryset = User.objects.all()
+class UserViewSet(SparseFieldsetViewMixin, viewsets.ModelViewSet):
+    queryset = User.objects.select_related('doctor_profile', 'patient_profile')
     serializer_class = UserRegisterSerializer
 
     def get_permissions(self):
@@ -0,0 +1,125 @@
+"""
+Sparse fieldsets: ``?fields=`` and ``?exclude=`` on read endpoints.
+
+Both take comma-separated top-level field names, e.g.
+``?fields=id,status,scheduled_time`` or ``?exclude=reason,meet_link``.
+Unknown names are a 400. Only safe methods are affected, so writes validate
+and respond exactly as before.
+
+``SparseFieldsetMixin`` trims a serializer's fields and
+``SparseFieldsetViewMixin`` pushes the same selection down into the query.
+Model columns no remaining field reads are deferred, and ``select_related``
+joins are kept only when a remaining field goes through them.
+"""
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import SAFE_METHODS
+
+
+def requested_names(request, param):
+    if request is None or request.method not in SAFE_METHODS:
+        return set()
+    return {name.strip() for name in request.query_params.get(param, '').split(',') if name.strip()}
+
+
+def is_sparse(request):
+    return bool(requested_names(request, 'fields') or requested_names(request, 'exclude'))
+
+
+def select_fields(available, request):
+    """
+    The names of ``available`` (in their order) selected by ``request``'s
+    ``?fields=``/``?exclude=``, or ``None`` when neither narrows the selection.
+    """
+    fields, exclude = requested_names(request, 'fields'), requested_names(request, 'exclude')
+    if not fields and not exclude:
+        return None
+    errors = {
+        param: [f"Unknown field(s): {', '.join(sorted(unknown))}."]
+        for param, unknown in (('fields', fields - set(available)), ('exclude', exclude - set(available)))
+        if unknown
+    }
+    if errors:
+        raise ValidationError(errors)
+    return [name for name in available if (not fields or name in fields) and name not in exclude]
+
+
+class SparseFieldsetMixin:
+    """
+    Serializer mixin that drops the readable fields not selected by the
+    request in ``context``. Only the root serializer is trimmed; nested
+    serializers keep their full representation.
+
+    A ``SerializerMethodField`` (or any field with ``source='*'``) gives no
+    hint of what it reads; list the model attributes it needs in
+    ``Meta.sparse_sources`` so the query can still be narrowed.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.sparse_fieldset = None
+        request = self.context.get('request')
+        if not is_sparse(request):
+            return
+        readable = [name for name, field in self.fields.items() if not field.write_only]
+        self.sparse_fieldset = select_fields(readable, request)
+        for name in set(readable) - set(self.sparse_fieldset):
+            self.fields.pop(name)
+
+    def sparse_sources(self):
+        """Model attributes read by the remaining fields, or ``None`` if unknown."""
+        declared = getattr(self.Meta, 'sparse_sources', {})
+        sources = set()
+        for name, field in self.fields.items():
+            if field.write_only:
+                continue
+            if name in declared:
+                sources.update(declared[name])
+            elif field.source == '*':
+                return None
+            else:
+                sources.add(field.source_attrs[0])
+        return sources
+
+
+def select_related_paths(tree, prefix=''):
+    for name, children in tree.items():
+        yield prefix + name
+        yield from select_related_paths(children, f"{prefix}{name}__")
+
+
+def sparse_queryset(queryset, sources):
+    """Defer the columns and drop the joins of ``queryset`` that ``sources`` do not use."""
+    opts = queryset.model._meta
+    known = {f.name for f in opts.get_fields()} | {f.attname for f in opts.concrete_fields}
+    if not sources <= known:
+        # A property or method may read any column.
+        return queryset
+
+    deferred = [
+        f.name for f in opts.concrete_fields
+        if not f.primary_key and f.name not in sources and f.attname not in sources
+    ]
+    tree = queryset.query.select_related
+    if isinstance(tree, dict):
+        kept = [path for path in select_related_paths(tree) if path.split('__', 1)[0] in sources]
+        queryset = queryset.select_related(None)
+        if kept:
+            queryset = queryset.select_related(*kept)
+    return queryset.defer(*deferred) if deferred else queryset
+
+
+class SparseFieldsetViewMixin:
+    """
+    View mixin that narrows ``filter_queryset()`` to the fields the
+    (``SparseFieldsetMixin``) serializer will output.
+    """
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if not is_sparse(self.request):
+            return queryset
+        serializer = self.get_serializer()
+        if getattr(serializer, 'sparse_fieldset', None) is None:
+            return queryset
+        sources = serializer.sparse_sources()
+        return queryset if sources is None else sparse_queryset(queryset, sources)
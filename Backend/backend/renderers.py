@@ -0,0 +1,64 @@
+"""
+API renderers: orjson for JSON and MessagePack for the mobile client.
+
+Both produce the same document as DRF's ``JSONRenderer``. Anything orjson or
+msgpack cannot encode natively (datetimes, Decimals, lazy strings, UUIDs,
+NumPy values) goes through DRF's ``JSONEncoder.default``, so datetimes keep
+the ``...Z`` form and Decimals become numbers exactly as before. A raw
+``FieldFile``/``ImageFieldFile`` renders as its absolute URL, or ``null``
+when empty, like a serializer ``FileField`` would.
+"""
+import msgpack
+import orjson
+from django.db.models.fields.files import FieldFile
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+
+
+def fallback_encoder(renderer_context):
+    """``default=`` hook shared by the renderers."""
+    encoder = JSONEncoder()
+    request = (renderer_context or {}).get('request')
+
+    def default(obj):
+        if isinstance(obj, FieldFile):
+            if not obj:
+                return None
+            return request.build_absolute_uri(obj.url) if request is not None else obj.url
+        return encoder.default(obj)
+
+    return default
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    Drop-in ``JSONRenderer`` backed by orjson. Indented output (an
+    ``; indent=`` media type parameter, or the browsable API) falls back to
+    the stdlib renderer.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+        ret = orjson.dumps(data, default=fallback_encoder(renderer_context), option=ORJSON_OPTIONS)
+        # Same JavaScript-safe escaping as JSONRenderer.
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
+
+
+class MessagePackRenderer(BaseRenderer):
+    """MessagePack, selected with ``Accept: application/msgpack`` or ``?format=msgpack``."""
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=fallback_encoder(renderer_context), use_bin_type=True, datetime=False)
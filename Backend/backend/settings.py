@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import tempfile
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -37,7 +38,8 @@ INSTALLED_APPS = [
     "django.contrib.messages",
     "django.contrib.staticfiles",
     "apps.users.apps.UsersConfig",
-    "apps.appointments",
+    "apps.appointments.apps.AppointmentsConfig",
+    "apps.uploads.apps.UploadsConfig",
     "rest_framework",
     "apps.otp",
     "corsheaders",
@@ -83,6 +85,13 @@ DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        "OPTIONS": {
+            # Take the write lock when a transaction starts so booking
+            # check-then-insert blocks cannot interleave (see
+            # apps.appointments.availability.doctor_schedule_lock).
+            "transaction_mode": "IMMEDIATE",
+            "timeout": 20,
+        },
     }
 }
 
@@ -112,7 +121,17 @@ REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
         "rest_framework_simplejwt.authentication.JWTAuthentication",
     ),
-    
+    "DEFAULT_RENDERER_CLASSES": [
+        "backend.renderers.ORJSONRenderer",
+        "backend.renderers.MessagePackRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "backend.parsers.ORJSONParser",
+        "backend.parsers.MessagePackParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
 
     "DEFAULT_THROTTLE_CLASSES": [
         "rest_framework.throttling.AnonRateThrottle",
@@ -129,6 +148,35 @@ REST_FRAMEWORK = {
 
 
 
+# Shared by all worker processes. Point these at Redis/Memcached when
+# running on more than one host.
+#
+# "default" holds throttle counters and cached responses (the doctor
+# directory, analytics). Once it is full, FileBasedCache culls a random
+# share of its entries, which only costs a rebuild.
+#
+# "coordination" holds the few keys that must not be culled at random: the
+# directory version (losing it would change every ETag) and the
+# rebuild locks of apps.appointments.caching. It stays far below its
+# MAX_ENTRIES, so throttle traffic in "default" can never evict them.
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": Path(tempfile.gettempdir()) / "medicare-cache",
+    },
+    "coordination": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": Path(tempfile.gettempdir()) / "medicare-coordination",
+        "OPTIONS": {"MAX_ENTRIES": 10000},
+    },
+}
+
+DOCTOR_DIRECTORY_CACHE_SECONDS = 3600
+ANALYTICS_CACHE_SECONDS = 60
+
+
+
+
 LANGUAGE_CODE = "en-us"
 
 TIME_ZONE = "UTC"
@@ -153,6 +201,35 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 DEFAULT_FROM_EMAIL = "no-reply@medicare.com"
 OTP_TTL_MINUTES = 10
 
+# Missed-appointment sweeper (manage.py sweep_missed_appointments)
+MISSED_APPOINTMENT_GRACE_MINUTES = 5
+MISSED_SWEEP_INTERVAL_SECONDS = 60
+MISSED_SWEEP_BATCH_SIZE = 500
+
+# Appointment list keyset pagination (?page_size= is capped at the max)
+APPOINTMENTS_PAGE_SIZE = 50
+APPOINTMENTS_MAX_PAGE_SIZE = 200
+APPOINTMENTS_BULK_MAX_OPERATIONS = 500
+
+# Prescription downloads: "direct" (Django serves ranges itself),
+# "x-accel-redirect" (nginx internal location at the prefix below, aliased
+# to MEDIA_ROOT) or "x-sendfile" (Apache mod_xsendfile / lighttpd).
+PRESCRIPTION_DELIVERY = "direct"
+PRESCRIPTION_ACCEL_PREFIX = "/protected/"
+# Lifetime of links minted by prescriptions/<id>/download_url/
+PRESCRIPTION_SIGNED_URL_SECONDS = 300
+
+# Resumable chunked uploads (apps.uploads). Partial files live in
+# UPLOAD_SESSION_DIR until they are finalized or purged.
+UPLOAD_SESSION_DIR = Path(tempfile.gettempdir()) / "medicare-uploads"
+UPLOAD_MAX_BYTES = {
+    "prescription": 25 * 1024 * 1024,
+    "profile_picture": 5 * 1024 * 1024,
+}
+UPLOAD_MAX_CHUNK_BYTES = 8 * 1024 * 1024
+UPLOAD_MAX_ACTIVE_SESSIONS = 3
+UPLOAD_SESSION_TTL_HOURS = 24
+
 
 SMS_API_KEY = ""  
 
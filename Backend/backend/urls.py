@@ -21,6 +21,7 @@ urlpatterns = [
     path("api/users/", include(("apps.users.urls", "users"), namespace="users")),
     path("api/appointments/",include(("apps.appointments.urls", "appointments"), namespace="appointments"),),
     path("api/otp/", include(("apps.otp.urls", "otp"), namespace="otp")),
+    path("api/uploads/", include(("apps.uploads.urls", "uploads"), namespace="uploads")),
 ]
 
 if settings.DEBUG: